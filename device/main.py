@@ -23,7 +23,7 @@ from src.services.event_logger import EventLogger
 from src.storage.offline_queue import OfflineQueue
 from src.api.dashboard_client import DashboardClient
 from src.utils.logging_setup import setup_logging
-from src.utils.system_monitor import SystemMonitor
+from src.utils.system_monitor import SystemMonitor, get_system_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +60,7 @@ class OpticShield:
             logger.info(f"Device Name: {self.config.device.name}")
             logger.info("=" * 60)
             
-            self.system_monitor = SystemMonitor(
+            self.system_monitor = get_system_monitor(
                 max_memory_mb=self.config.system.max_memory_mb,
                 max_cpu_percent=self.config.system.max_cpu_percent,
                 check_interval=30
@@ -296,7 +296,7 @@ class TestRunner:
         monitor = SystemMonitor(check_interval=1)
         stats = monitor.get_stats()
 
-        return True, f"CPU={stats.cpu_percent}%"
+        return True, f"CPU={stats.cpu_percent:.1f}%"
 
 
 def print_report(report: TestReport):
@@ -306,54 +306,60 @@ def print_report(report: TestReport):
     BLUE = "\033[94m"
     NC = "\033[0m"
 
-    print()
-    print(f"{BLUE}╔══════════════════════════════════════════════════════════════╗{NC}")
-    print(
+    # Collected and written once rather than one print() per line
+    lines: List[str] = []
+    out = lines.append
+
+    out("")
+    out(f"{BLUE}╔══════════════════════════════════════════════════════════════╗{NC}")
+    out(
         f"{BLUE}║{NC}                  OPTIC-SHIELD TEST REPORT                    {BLUE}║{NC}"
     )
-    print(f"{BLUE}╠══════════════════════════════════════════════════════════════╣{NC}")
+    out(f"{BLUE}╠══════════════════════════════════════════════════════════════╣{NC}")
 
     # Summary
-    print(f"{BLUE}║{NC}  Tests Run:    {len(report.tests)}")
-    print(f"{BLUE}║{NC}  {GREEN}Passed:{NC}       {report.passed_count}")
-    print(f"{BLUE}║{NC}  {RED}Failed:{NC}       {report.failed_count}")
-    print(f"{BLUE}║{NC}  Duration:     {report.total_duration_ms:.1f}ms")
+    out(f"{BLUE}║{NC}  Tests Run:    {len(report.tests)}")
+    out(f"{BLUE}║{NC}  {GREEN}Passed:{NC}       {report.passed_count}")
+    out(f"{BLUE}║{NC}  {RED}Failed:{NC}       {report.failed_count}")
+    out(f"{BLUE}║{NC}  Duration:     {report.total_duration_ms:.1f}ms")
 
-    print(f"{BLUE}╠══════════════════════════════════════════════════════════════╣{NC}")
+    out(f"{BLUE}╠══════════════════════════════════════════════════════════════╣{NC}")
 
     if report.all_passed:
-        print(
+        out(
             f"{BLUE}║{NC}                                                              {BLUE}║{NC}"
         )
-        print(
+        out(
             f"{BLUE}║{NC}   {GREEN}✅ TESTED OK - All tests passed!{NC}                          {BLUE}║{NC}"
         )
-        print(
+        out(
             f"{BLUE}║{NC}   {GREEN}   Ready to use OPTIC-SHIELD{NC}                              {BLUE}║{NC}"
         )
-        print(
+        out(
             f"{BLUE}║{NC}                                                              {BLUE}║{NC}"
         )
     else:
-        print(
+        out(
             f"{BLUE}║{NC}                                                              {BLUE}║{NC}"
         )
-        print(
+        out(
             f"{BLUE}║{NC}   {RED}❌ TESTS FAILED{NC}                                            {BLUE}║{NC}"
         )
-        print(
+        out(
             f"{BLUE}║{NC}                                                              {BLUE}║{NC}"
         )
 
         # Show failed tests
         for test in report.tests:
             if not test.passed:
-                print(
+                out(
                     f"{BLUE}║{NC}   {RED}✗{NC} {test.name}: {test.error or test.message}"
                 )
 
-    print(f"{BLUE}╚══════════════════════════════════════════════════════════════╝{NC}")
-    print()
+    out(f"{BLUE}╚══════════════════════════════════════════════════════════════╝{NC}")
+    out("")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def save_report(report: TestReport, filepath: Path):
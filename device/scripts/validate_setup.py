@@ -16,6 +16,8 @@ import sys
 import json
 import argparse
 import subprocess
+import importlib.util
+from importlib import metadata
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
@@ -216,12 +218,16 @@ class SetupValidator:
             ("yaml", "PyYAML"),
         ]
 
+        # Locate packages without importing them; importing ultralytics
+        # pulls in torch and takes seconds on a Pi
         for import_name, package_name in deps:
+            if importlib.util.find_spec(import_name) is None:
+                missing.append(package_name)
+                continue
             try:
-                __import__(import_name)
+                installed.append(f"{package_name} {metadata.version(package_name)}")
+            except metadata.PackageNotFoundError:
                 installed.append(package_name)
-            except ImportError:
-                missing.append(package_name)
 
         if missing:
             return CheckResult(
@@ -234,6 +240,7 @@ class SetupValidator:
             name="Core Dependencies",
             status=CheckStatus.PASS,
             message=f"All installed ({len(installed)} packages)",
+            details=", ".join(installed),
         )
 
     def _check_opencv(self) -> CheckResult:
@@ -483,6 +490,12 @@ class SetupValidator:
                     status=CheckStatus.PASS,
                     message=f"Detected: {hw.camera_type}",
                 )
+            elif detector.verify_camera_openable():
+                return CheckResult(
+                    name="Camera Hardware",
+                    status=CheckStatus.PASS,
+                    message="Detected: usb_camera (opened via OpenCV)",
+                )
             else:
                 return CheckResult(
                     name="Camera Hardware",
@@ -0,0 +1,92 @@
+"""
+Numeric kernels for the detection hot path.
+JIT-compiled with Numba when available, with NumPy fallbacks otherwise.
+"""
+
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+# Upper bound for class ids tracked in lookup tables (COCO/ImageNet fit easily)
+MAX_CLASS_ID = 1024
+
+
+def build_class_mask(class_ids, size: int = MAX_CLASS_ID) -> np.ndarray:
+    """Build a boolean lookup table indexed by class id."""
+    class_ids = [int(c) for c in class_ids]
+    size = max(size, max(class_ids, default=-1) + 1)
+    mask = np.zeros(size, dtype=np.bool_)
+    if class_ids:
+        mask[class_ids] = True
+    return mask
+
+
+def _filter_targets(cls, conf, target_mask, conf_thr):
+    """Return indices of boxes whose class is targeted and confidence passes."""
+    n = cls.shape[0]
+    size = target_mask.shape[0]
+    keep = np.empty(n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        c = cls[i]
+        if c >= 0 and c < size and target_mask[c] and conf[i] >= conf_thr:
+            keep[count] = i
+            count += 1
+    return keep[:count]
+
+
+def _filter_targets_numpy(cls, conf, target_mask, conf_thr):
+    """Vectorized NumPy equivalent of _filter_targets."""
+    in_range = (cls >= 0) & (cls < target_mask.shape[0])
+    keep = np.zeros(cls.shape[0], dtype=np.bool_)
+    keep[in_range] = target_mask[cls[in_range]]
+    keep &= conf >= conf_thr
+    return np.flatnonzero(keep)
+
+
+def _apply_cooldown(class_ids, last_times, cooldown, now):
+    """
+    Mark detections outside the per-class cooldown window.
+
+    Updates last_times in place; detections of the same class later in
+    the batch fall inside the window just opened by the first one.
+    """
+    n = class_ids.shape[0]
+    size = last_times.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        c = class_ids[i]
+        if c < 0 or c >= size:
+            keep[i] = True
+            continue
+        if now - last_times[c] >= cooldown:
+            keep[i] = True
+            last_times[c] = now
+    return keep
+
+
+try:
+    # Prebuilt by _kernels_aot for deployment; loads without any JIT step
+    from .optic_kernels import apply_cooldown, filter_targets
+    KERNELS_AOT = True
+except ImportError:
+    KERNELS_AOT = False
+    if NUMBA_AVAILABLE:
+        filter_targets = numba.njit(cache=True)(_filter_targets)
+        apply_cooldown = numba.njit(cache=True)(_apply_cooldown)
+    else:
+        filter_targets = _filter_targets_numpy
+        apply_cooldown = _apply_cooldown
+
+
+def warmup_kernels():
+    """Trigger JIT compilation so the first frame doesn't pay for it."""
+    cls = np.zeros(1, dtype=np.int64)
+    conf = np.ones(1, dtype=np.float32)
+    filter_targets(cls, conf, build_class_mask([0]), 0.5)
+    apply_cooldown(cls, np.zeros(MAX_CLASS_ID, dtype=np.float64), 60.0, 0.0)
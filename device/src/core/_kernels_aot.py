@@ -0,0 +1,26 @@
+"""
+Ahead-of-time build of the detection kernels for deployment images.
+Run `python -m src.core._kernels_aot` from the device directory on the target.
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from ._detect_kernels import _apply_cooldown, _filter_targets
+from ._preproc import _letterbox_norm_chw
+
+cc = CC("optic_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent)
+cc.verbose = True
+
+cc.export("filter_targets", "i8[:](i8[:], f4[:], b1[:], f8)")(_filter_targets)
+cc.export("apply_cooldown", "b1[:](i8[:], f8[:], f8, f8)")(_apply_cooldown)
+# AOT compilation does not support parallel=True; this build is serial
+cc.export(
+    "letterbox_norm_chw", "Tuple((f8, i8, i8))(u1[:, :, :], f4[:, :, :], i8)"
+)(_letterbox_norm_chw)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -47,6 +47,9 @@ class ModelConfig:
     confidence_threshold: float = 0.5
     iou_threshold: float = 0.45
     max_detections: int = 10
+    int8: bool = False
+    calibration_data: str = ""
+    fp16: bool = False
 
 
 @dataclass
@@ -58,7 +61,8 @@ class DetectionConfig:
     input_size: int = 640
     batch_size: int = 1
     use_ncnn: bool = True
-    num_threads: int = 4
+    num_threads: int = 0  # 0 = auto (leave one core for capture)
+    interop_threads: int = 1
 
 
 @dataclass
@@ -147,6 +151,7 @@ class SystemConfig:
     max_memory_mb: int = 512
     max_cpu_percent: int = 80
     shutdown_timeout_seconds: int = 10
+    cpu_affinity_enabled: bool = False
 
 
 @dataclass
@@ -156,6 +161,7 @@ class LoggingConfig:
     console: bool = True
     file: bool = True
     file_path: str = "logs/optic-shield.log"
+    trim_record_fields: bool = False
 
 
 class Config:
@@ -240,6 +246,9 @@ class Config:
                     confidence_threshold=m.get("confidence_threshold", 0.5),
                     iou_threshold=m.get("iou_threshold", 0.45),
                     max_detections=m.get("max_detections", 10),
+                    int8=m.get("int8", False),
+                    calibration_data=m.get("calibration_data", ""),
+                    fp16=m.get("fp16", False),
                 ),
                 target_classes=d.get(
                     "target_classes", [14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
@@ -247,7 +256,8 @@ class Config:
                 input_size=d.get("input_size", 640),
                 batch_size=d.get("batch_size", 1),
                 use_ncnn=d.get("use_ncnn", True),
-                num_threads=d.get("num_threads", 4),
+                num_threads=d.get("num_threads", 0),
+                interop_threads=d.get("interop_threads", 1),
             )
 
         if "camera" in cfg:
@@ -333,6 +343,7 @@ class Config:
                 max_memory_mb=s.get("max_memory_mb", 512),
                 max_cpu_percent=s.get("max_cpu_percent", 80),
                 shutdown_timeout_seconds=s.get("shutdown_timeout_seconds", 10),
+                cpu_affinity_enabled=s.get("cpu_affinity_enabled", False),
             )
 
         if "logging" in cfg:
@@ -345,6 +356,7 @@ class Config:
                 console=l.get("console", True),
                 file=l.get("file", True),
                 file_path=l.get("file_path", "logs/optic-shield.log"),
+                trim_record_fields=l.get("trim_record_fields", False),
             )
 
     def _apply_env_overrides(self):
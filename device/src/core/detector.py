@@ -4,6 +4,8 @@ Supports NCNN format for maximum performance on ARM architecture.
 """
 
 import logging
+import os
+import sys
 import time
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
@@ -12,12 +14,67 @@ import threading
 
 import numpy as np
 
+from ._detect_kernels import build_class_mask, filter_targets, warmup_kernels
+from ._preproc import letterbox_norm_chw, warmup_preproc
+
 logger = logging.getLogger(__name__)
 
+# Loaded YOLO models keyed by (path, task, mtime), so a service restart
+# reuses the already initialized model instead of loading it again
+_LOADED_MODELS: Dict[Tuple[str, Optional[str], float], Any] = {}
+_LOADED_MODELS_LOCK = threading.Lock()
+
+
+def _ncnn_export_args() -> Optional[set]:
+    """
+    Export arguments the installed ultralytics accepts for NCNN.
+    
+    Returns None when the exporter doesn't publish them (older releases).
+    """
+    try:
+        from ultralytics.engine.exporter import export_formats
+        
+        formats = export_formats()
+        names = list(formats["Argument"])
+        return set(formats["Arguments"][names.index("ncnn")])
+    except Exception:
+        return None
+
+
+def _load_yolo(yolo_cls, path: str, task: Optional[str] = None):
+    """Load a YOLO model, reusing a cached instance for unchanged files."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = 0.0
+    key = (path, task, mtime)
+    
+    with _LOADED_MODELS_LOCK:
+        model = _LOADED_MODELS.get(key)
+        if model is not None:
+            logger.debug("Reusing cached model: %s", path)
+            return model
+        
+        for stale in [k for k in _LOADED_MODELS if k[0] == path]:
+            del _LOADED_MODELS[stale]
+        
+        model = yolo_cls(path, task=task) if task else yolo_cls(path)
+        _LOADED_MODELS[key] = model
+        return model
 
-@dataclass
+
+def clear_model_cache():
+    """Drop all cached models so their memory can be reclaimed."""
+    with _LOADED_MODELS_LOCK:
+        _LOADED_MODELS.clear()
+
+
+@dataclass(frozen=True)
 class Detection:
     """Represents a single detection result."""
+    # Explicit slots rather than dataclass(slots=True), which needs 3.10+
+    __slots__ = ("class_id", "class_name", "confidence", "bbox", "timestamp")
+    
     class_id: int
     class_name: str
     confidence: float
@@ -60,32 +117,65 @@ class WildlifeDetector:
         iou_threshold: float = 0.45,
         target_classes: Optional[List[int]] = None,
         use_ncnn: bool = True,
-        num_threads: int = 4
+        num_threads: int = 4,
+        int8: bool = False,
+        calibration_data: str = "",
+        interop_threads: int = 1,
+        input_size: int = 640,
+        batch_size: int = 1,
+        max_detections: int = 10,
+        cpu_affinity: bool = False,
+        fp16: bool = False
     ):
         self.model_path = Path(model_path)
         self.fallback_path = Path(fallback_path) if fallback_path else None
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
         self.target_classes = target_classes or list(self.WILD_CAT_CLASSES.keys())
+        self._target_mask = build_class_mask(self.target_classes)
         self.use_ncnn = use_ncnn
-        self.num_threads = num_threads
+        self.num_threads = num_threads if num_threads > 0 else self.default_num_threads()
+        self.interop_threads = max(1, interop_threads)
+        self.int8 = int8
+        self.calibration_data = calibration_data
+        self.input_size = input_size
+        self.batch_size = max(1, batch_size)
+        self.max_detections = max_detections
+        self.cpu_affinity = cpu_affinity
+        self.fp16 = fp16
         
         self.model = None
         self.model_loaded = False
         self._lock = threading.Lock()
-        self._inference_times: List[float] = []
+        self._generation = 0
         self._max_inference_history = 100
+        self._inference_times = np.zeros(self._max_inference_history, dtype=np.float32)
+        self._inf_idx = 0
+        self._inf_count = 0
+        
+        # Preallocated model input buffers, reused every frame
+        self._preproc_enabled = False
+        self._preproc_uint8: Optional[np.ndarray] = None
+        self._preproc_float: Optional[np.ndarray] = None
+        self._preproc_tensor = None
         
     def load_model(self) -> bool:
         """Load the YOLO model with fallback support."""
         try:
+            self._configure_threads()
+            
             from ultralytics import YOLO
             
             model_to_load = None
+            ncnn_dir = self._prepare_ncnn_model(YOLO) if self.use_ncnn else None
             
-            if self.model_path.exists():
+            if ncnn_dir is not None:
+                model_to_load = str(ncnn_dir)
+                logger.info(f"Loading NCNN model from: {ncnn_dir}")
+            elif self.model_path.exists():
                 model_to_load = str(self.model_path)
                 logger.info(f"Loading model from: {self.model_path}")
+                self.use_ncnn = self._is_ncnn_dir(self.model_path)
             elif self.fallback_path and self.fallback_path.exists():
                 model_to_load = str(self.fallback_path)
                 logger.warning(f"Primary model not found, using fallback: {self.fallback_path}")
@@ -95,12 +185,15 @@ class WildlifeDetector:
                 model_to_load = "yolo11n.pt"
                 self.use_ncnn = False
             
-            self.model = YOLO(model_to_load)
+            self.model = _load_yolo(YOLO, model_to_load, "detect" if self.use_ncnn else None)
             self.model_loaded = True
+            # The NCNN graph carries its own precision; FP16 only applies to .pt
+            self.fp16 = self.fp16 and not self.use_ncnn
             
+            self._allocate_preproc_buffers(self.batch_size)
             self._warmup()
             
-            logger.info(f"Model loaded successfully (NCNN: {self.use_ncnn})")
+            logger.info(f"Model loaded successfully (NCNN: {self.use_ncnn}, FP16: {self.fp16})")
             return True
             
         except Exception as e:
@@ -108,92 +201,365 @@ class WildlifeDetector:
             self.model_loaded = False
             return False
     
+    @staticmethod
+    def default_num_threads() -> int:
+        """Pick an inference thread count that leaves one core for capture."""
+        return max(1, min(4, (os.cpu_count() or 1) - 1))
+    
+    def _configure_threads(self):
+        """Size the OpenMP, libtorch and OpenCV thread pools before loading."""
+        os.environ.setdefault("OMP_NUM_THREADS", str(self.num_threads))
+        os.environ.setdefault("MKL_NUM_THREADS", str(self.num_threads))
+        
+        cpu_count = os.cpu_count() or 1
+        if self.cpu_affinity and sys.platform == "linux" and cpu_count > 1:
+            # Keep OpenMP workers on the inference cores, off core 0
+            os.environ.setdefault("GOMP_CPU_AFFINITY", f"1-{cpu_count - 1}")
+            os.environ.setdefault("OMP_PROC_BIND", "close")
+            os.environ.setdefault("OMP_PLACES", "cores")
+        
+        try:
+            import torch
+            torch.set_num_threads(self.num_threads)
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:
+                # Can only be set once, before any inter-op work has started
+                logger.debug("torch inter-op threads already configured")
+        except ImportError:
+            pass
+        
+        try:
+            import cv2
+            cv2.setNumThreads(0)
+        except ImportError:
+            pass
+        
+        logger.info(
+            f"Inference threads: {self.num_threads} (inter-op: {self.interop_threads})"
+        )
+    
+    @staticmethod
+    def _is_ncnn_dir(path: Path) -> bool:
+        """Check whether a path is an exported NCNN model directory."""
+        return path.is_dir() and (path / "model.ncnn.param").exists()
+    
+    def _prepare_ncnn_model(self, yolo_cls) -> Optional[Path]:
+        """
+        Locate the NCNN model, exporting it from the .pt weights when needed.
+        
+        The export is cached next to the .pt file and only redone when the
+        weights are newer than the exported model. Returns None if no NCNN
+        model is available, so the caller can fall back to the .pt weights.
+        """
+        pt_path = None
+        if self.model_path.suffix == ".pt" and self.model_path.exists():
+            pt_path = self.model_path
+        elif self.fallback_path and self.fallback_path.suffix == ".pt" and self.fallback_path.exists():
+            pt_path = self.fallback_path
+        
+        if pt_path is None:
+            return self.model_path if self._is_ncnn_dir(self.model_path) else None
+        
+        ncnn_dir = pt_path.with_name(f"{pt_path.stem}_ncnn_model")
+        pt_mtime = pt_path.stat().st_mtime
+        if self._is_ncnn_dir(ncnn_dir) and ncnn_dir.stat().st_mtime >= pt_mtime:
+            return ncnn_dir
+        
+        # A failed export is remembered until the weights change, so a
+        # broken exporter doesn't cost a .pt load on every boot
+        failed_marker = pt_path.with_name(f"{pt_path.stem}_ncnn_export.failed")
+        if failed_marker.exists() and failed_marker.stat().st_mtime >= pt_mtime:
+            logger.info(f"Skipping NCNN export; it failed before for {pt_path}")
+            return self.model_path if self._is_ncnn_dir(self.model_path) else None
+        
+        export_kwargs = {"format": "ncnn"}
+        if self.int8:
+            if "int8" in (_ncnn_export_args() or ()):
+                export_kwargs["int8"] = True
+                if self.calibration_data:
+                    export_kwargs["data"] = self.calibration_data
+            else:
+                logger.warning("Installed ultralytics cannot export INT8 NCNN; exporting FP32")
+        
+        try:
+            logger.info(f"Exporting {pt_path} to NCNN ({export_kwargs})...")
+            exported = Path(yolo_cls(str(pt_path)).export(**export_kwargs))
+            if self._is_ncnn_dir(exported):
+                if failed_marker.exists():
+                    failed_marker.unlink()
+                return exported
+            logger.warning(f"NCNN export produced no usable model at {exported}")
+        except Exception as e:
+            logger.warning(f"NCNN export failed, falling back to PyTorch model: {e}")
+        
+        try:
+            failed_marker.touch()
+        except OSError:
+            pass
+        return self.model_path if self._is_ncnn_dir(self.model_path) else None
+    
     def _warmup(self):
         """Warm up the model with a dummy inference."""
         if not self.model:
             return
         
         try:
+            warmup_kernels()
+            warmup_preproc()
             dummy_image = np.zeros((480, 640, 3), dtype=np.uint8)
-            self.model(dummy_image, verbose=False)
+            results, _ = self._infer(self.model, [dummy_image])
+            if self.fp16 and self._has_nan(results):
+                raise FloatingPointError("NaN in FP16 output")
             logger.debug("Model warmup completed")
         except Exception as e:
+            if self.fp16:
+                logger.warning(f"FP16 inference unusable, falling back to FP32: {e}")
+                self._disable_fp16()
+                self._warmup()
+                return
             logger.warning(f"Model warmup failed: {e}")
     
+    @staticmethod
+    def _has_nan(results) -> bool:
+        """Check whether any result box contains NaN values."""
+        for result in results or []:
+            boxes = getattr(result, "boxes", None)
+            if boxes is not None and len(boxes) and bool(boxes.data.isnan().any()):
+                return True
+        return False
+    
+    def _disable_fp16(self):
+        """Restore FP32 weights and force ultralytics to rebuild its predictor."""
+        self.fp16 = False
+        try:
+            self.model.model.float()
+        except Exception:
+            pass
+        self.model.predictor = None
+    
     def detect(self, frame: np.ndarray) -> List[Detection]:
         """
         Run detection on a single frame.
         
         Args:
-            frame: BGR or RGB image as numpy array
+            frame: RGB image as numpy array
             
         Returns:
             List of Detection objects for target classes
         """
-        if not self.model_loaded or self.model is None:
+        return self.detect_batch([frame])[0]
+    
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        """
+        Run detection on a batch of frames with a single model call.
+        
+        Args:
+            frames: RGB images as numpy arrays
+            
+        Returns:
+            One list of Detection objects per input frame
+        """
+        batch_detections: List[List[Detection]] = [[] for _ in frames]
+        if not frames:
+            return batch_detections
+        
+        # Inference runs on a single thread; unload() bumps the generation
+        # so a result computed with a model being unloaded is discarded.
+        generation = self._generation
+        model = self.model
+        if not self.model_loaded or model is None:
             logger.warning("Model not loaded, skipping detection")
-            return []
+            return batch_detections
         
-        detections = []
         start_time = time.perf_counter()
         
         try:
-            with self._lock:
-                results = self.model(
-                    frame,
-                    conf=self.confidence_threshold,
-                    iou=self.iou_threshold,
-                    verbose=False
-                )
+            results, transforms = self._infer(model, frames)
+            if generation != self._generation:
+                return batch_detections
             
-            inference_time = (time.perf_counter() - start_time) * 1000
+            inference_time = (time.perf_counter() - start_time) * 1000 / len(frames)
             self._record_inference_time(inference_time)
             
-            if results and len(results) > 0:
-                result = results[0]
-                
-                if result.boxes is not None:
-                    for box in result.boxes:
-                        class_id = int(box.cls[0])
-                        
-                        if class_id not in self.target_classes:
-                            continue
-                        
-                        confidence = float(box.conf[0])
-                        x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                        
-                        class_name = self.WILD_CAT_CLASSES.get(
-                            class_id, 
-                            self.model.names.get(class_id, f"class_{class_id}")
-                        )
-                        
-                        detection = Detection(
-                            class_id=class_id,
-                            class_name=class_name,
-                            confidence=confidence,
-                            bbox=(x1, y1, x2, y2),
-                            timestamp=time.time()
-                        )
-                        detections.append(detection)
+            now = time.time()
+            for detections, result, transform, frame in zip(
+                batch_detections, results or [], transforms, frames
+            ):
+                self._collect_detections(
+                    model, result, detections, transform, frame.shape, now
+                )
             
-            logger.debug(f"Detection completed in {inference_time:.1f}ms, found {len(detections)} wild cats")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Detection completed in %.1fms/frame over %d frame(s), found %d wild cats",
+                    inference_time, len(frames), sum(len(d) for d in batch_detections)
+                )
             
         except Exception as e:
-            logger.error(f"Detection error: {e}")
+            logger.error("Detection error: %s", e)
+        
+        return batch_detections
+    
+    def _allocate_preproc_buffers(self, batch: int):
+        """Allocate the letterbox scratch and normalized CHW input tensor."""
+        try:
+            import torch
+            if letterbox_norm_chw is None:
+                import cv2  # noqa: F401
+        except ImportError:
+            logger.debug("torch/cv2 unavailable, using ultralytics preprocessing")
+            self._preproc_enabled = False
+            return
+        
+        size = self.input_size
+        self._preproc_uint8 = np.full((size, size, 3), 114, dtype=np.uint8)
+        self._preproc_float = np.zeros((batch, 3, size, size), dtype=np.float32)
+        self._preproc_tensor = torch.from_numpy(self._preproc_float)
+        self._preproc_enabled = True
+    
+    def _letterbox_into(self, frame: np.ndarray, index: int) -> Tuple[float, int, int]:
+        """
+        Letterbox an RGB frame into slot `index` of the input tensor.
+        
+        Returns:
+            (scale, pad_x, pad_y) needed to map boxes back to the frame
+        """
+        if letterbox_norm_chw is not None:
+            # Fused resize + normalize + CHW transpose, parallel over rows
+            return letterbox_norm_chw(
+                np.ascontiguousarray(frame), self._preproc_float[index], 114
+            )
+        
+        import cv2
+        
+        size = self.input_size
+        h, w = frame.shape[:2]
+        scale = min(size / h, size / w)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+        
+        canvas = self._preproc_uint8
+        canvas.fill(114)
+        if (new_w, new_h) == (w, h):
+            canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+        else:
+            canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+                frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+            )
+        
+        # Normalize and transpose HWC -> CHW in a single pass into the tensor
+        np.multiply(
+            canvas.transpose(2, 0, 1), np.float32(1.0 / 255.0),
+            out=self._preproc_float[index], casting="unsafe"
+        )
+        return scale, pad_x, pad_y
+    
+    def _infer(self, model, frames: List[np.ndarray]):
+        """
+        Run the model on frames, preprocessing into the shared input tensor.
+        
+        Returns:
+            (results, transforms) with one letterbox transform per frame
+        """
+        if not self._preproc_enabled:
+            identity = [(1.0, 0, 0)] * len(frames)
+            if self.use_ncnn:
+                # Exported NCNN graphs have a fixed batch size of one
+                results = []
+                for frame in frames:
+                    results.extend(self._predict(model, frame))
+                return results, identity
+            return self._predict(model, frames), identity
+        
+        if self._preproc_float.shape[0] < len(frames):
+            self._allocate_preproc_buffers(len(frames))
         
-        return detections
+        transforms = [self._letterbox_into(frame, i) for i, frame in enumerate(frames)]
+        
+        if self.use_ncnn:
+            results = []
+            for i in range(len(frames)):
+                results.extend(self._predict(model, self._preproc_tensor[i:i + 1]))
+            return results, transforms
+        
+        return self._predict(model, self._preproc_tensor[:len(frames)]), transforms
+    
+    def _predict(self, model, source):
+        """Invoke the underlying model on frames or a preprocessed tensor."""
+        # Class filtering happens inside NMS, so non-target boxes never
+        # reach the Python side
+        return model.predict(
+            source=source,
+            imgsz=self.input_size,
+            conf=self.confidence_threshold,
+            iou=self.iou_threshold,
+            classes=self.target_classes,
+            agnostic_nms=True,
+            max_det=self.max_detections,
+            half=self.fp16,
+            augment=False,
+            stream=False,
+            verbose=False
+        )
+    
+    def _collect_detections(
+        self,
+        model,
+        result,
+        detections: List[Detection],
+        transform: Tuple[float, int, int],
+        frame_shape: Tuple[int, ...],
+        timestamp: float
+    ):
+        """Append target-class detections from a single result."""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return
+        
+        # One (N, 6) transfer: x1, y1, x2, y2, conf, cls
+        data = boxes.data.cpu().numpy()
+        xyxy = data[:, :4]
+        conf = data[:, 4].astype(np.float32)
+        cls = data[:, 5].astype(np.int64)
+        
+        scale, pad_x, pad_y = transform
+        if scale != 1.0 or pad_x or pad_y:
+            xyxy = (xyxy - (pad_x, pad_y, pad_x, pad_y)) / scale
+            xyxy[:, 0::2] = xyxy[:, 0::2].clip(0, frame_shape[1])
+            xyxy[:, 1::2] = xyxy[:, 1::2].clip(0, frame_shape[0])
+        
+        keep = filter_targets(cls, conf, self._target_mask, self.confidence_threshold)
+        
+        for i in keep:
+            class_id = int(cls[i])
+            x1, y1, x2, y2 = (int(v) for v in xyxy[i])
+            
+            class_name = self.WILD_CAT_CLASSES.get(class_id)
+            if class_name is None:
+                class_name = model.names.get(class_id, f"class_{class_id}")
+            
+            detection = Detection(
+                class_id=class_id,
+                class_name=class_name,
+                confidence=float(conf[i]),
+                bbox=(x1, y1, x2, y2),
+                timestamp=timestamp
+            )
+            detections.append(detection)
     
     def _record_inference_time(self, time_ms: float):
         """Record inference time for performance monitoring."""
-        self._inference_times.append(time_ms)
-        if len(self._inference_times) > self._max_inference_history:
-            self._inference_times.pop(0)
+        self._inference_times[self._inf_idx] = time_ms
+        self._inf_idx = (self._inf_idx + 1) % self._max_inference_history
+        if self._inf_count < self._max_inference_history:
+            self._inf_count += 1
     
     def get_average_inference_time(self) -> float:
         """Get average inference time in milliseconds."""
-        if not self._inference_times:
+        if not self._inf_count:
             return 0.0
-        return sum(self._inference_times) / len(self._inference_times)
+        return float(self._inference_times[:self._inf_count].mean())
     
     def get_fps(self) -> float:
         """Get estimated FPS based on inference time."""
@@ -213,9 +579,18 @@ class WildlifeDetector:
             "confidence_threshold": self.confidence_threshold
         }
     
-    def unload(self):
-        """Unload model to free memory."""
+    def unload(self, keep_cached: bool = True):
+        """
+        Unload the model from this detector.
+        
+        Args:
+            keep_cached: Keep the model in the module cache so a restart can
+                reuse it; pass False to free its memory as well
+        """
         with self._lock:
+            self._generation += 1
             self.model = None
             self.model_loaded = False
+        if not keep_cached:
+            clear_model_cache()
         logger.info("Model unloaded")
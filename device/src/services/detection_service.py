@@ -3,23 +3,52 @@ Main detection service that orchestrates camera, detector, and storage.
 Designed for continuous 24/7 operation with robust error handling.
 """
 
+import itertools
 import logging
+import os
+import sys
 import time
 import threading
 import signal
-from typing import Optional, Callable, List, Dict, Any
+from typing import Optional, Callable, List, Dict, Any, Set
 from dataclasses import dataclass
-from queue import Queue, Empty
+from queue import Queue, SimpleQueue, Empty, Full
 from enum import Enum
 
+import numpy as np
+
 from ..core.config import Config
 from ..core.detector import WildlifeDetector, Detection
 from ..core.camera import CameraManager, CameraFrame
+from ..core._detect_kernels import MAX_CLASS_ID, apply_cooldown
 from ..storage.database import DetectionDatabase, DetectionRecord
 from ..storage.image_store import ImageStore
 
 logger = logging.getLogger(__name__)
 
+# How often the database writer refreshes SQLite query planner statistics
+DB_OPTIMIZE_INTERVAL_SECONDS = 15 * 60
+
+
+def _pin_current_thread(cores: Set[int]):
+    """Pin the calling thread to the given CPU cores (Linux only)."""
+    if sys.platform != "linux" or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        target = set(cores) & os.sched_getaffinity(0)
+        if target:
+            os.sched_setaffinity(0, target)
+    except OSError as e:
+        logger.debug(f"Could not set CPU affinity: {e}")
+
+
+def _offer(queue: SimpleQueue, item: Any, max_size: int) -> bool:
+    """Put an item on a SimpleQueue unless it already holds max_size items."""
+    if queue.qsize() >= max_size:
+        return False
+    queue.put(item)
+    return True
+
 
 class ServiceState(Enum):
     STOPPED = "stopped"
@@ -61,14 +90,35 @@ class DetectionService:
         self.image_store: Optional[ImageStore] = None
         
         self._detection_callbacks: List[Callable[[DetectionEvent], None]] = []
-        self._detection_queue: Queue = Queue(maxsize=100)
+        self._inference_queue: Queue = Queue(maxsize=8)
+        self._detection_queue: SimpleQueue = SimpleQueue()
+        self._image_write_queue: SimpleQueue = SimpleQueue()
+        self._db_write_queue: SimpleQueue = SimpleQueue()
+        self._detection_queue_max = 100
+        self._image_write_queue_max = 64
+        self._db_write_queue_max = 256
+        self._db_write_batch_size = 32
+        self._image_seq = itertools.count()
+        
+        # Capture and disk I/O share core 0 (where camera IRQs usually land);
+        # inference and its OpenMP workers get the remaining cores
+        cpu_count = os.cpu_count() or 1
+        self._io_cores: Set[int] = {0}
+        self._inference_cores: Set[int] = set(range(1, cpu_count)) or {0}
         
         self._main_thread: Optional[threading.Thread] = None
+        self._inference_thread: Optional[threading.Thread] = None
         self._processing_thread: Optional[threading.Thread] = None
+        self._image_writer_thread: Optional[threading.Thread] = None
+        self._db_writer_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Set once the image writer has drained; it hands records to the
+        # DB writer, which must not exit before the last of them arrives
+        self._images_drained = threading.Event()
         
-        self._last_detection_time: Dict[str, float] = {}
+        self._last_detection_time = np.zeros(MAX_CLASS_ID, dtype=np.float64)
         self._frame_count = 0
+        self._frames_dropped = 0
         self._detection_count = 0
         self._error_count = 0
         self._start_time: Optional[float] = None
@@ -118,7 +168,15 @@ class DetectionService:
                 iou_threshold=self.config.detection.model.iou_threshold,
                 target_classes=self.config.detection.target_classes,
                 use_ncnn=self.config.detection.use_ncnn,
-                num_threads=self.config.detection.num_threads
+                num_threads=self.config.detection.num_threads,
+                interop_threads=self.config.detection.interop_threads,
+                input_size=self.config.detection.input_size,
+                batch_size=self.config.detection.batch_size,
+                max_detections=self.config.detection.model.max_detections,
+                cpu_affinity=self.config.system.cpu_affinity_enabled,
+                int8=self.config.detection.model.int8,
+                calibration_data=self.config.detection.model.calibration_data,
+                fp16=self.config.detection.model.fp16
             )
             if not self.detector.load_model():
                 raise RuntimeError("Model loading failed")
@@ -160,9 +218,24 @@ class DetectionService:
                 return
         
         self._stop_event.clear()
+        self._images_drained.clear()
         self._start_time = time.time()
         self.state = ServiceState.RUNNING
         
+        self._image_writer_thread = threading.Thread(
+            target=self._image_writer_loop,
+            name="ImageWriter",
+            daemon=True
+        )
+        self._image_writer_thread.start()
+        
+        self._db_writer_thread = threading.Thread(
+            target=self._db_writer_loop,
+            name="DatabaseWriter",
+            daemon=True
+        )
+        self._db_writer_thread.start()
+        
         self._processing_thread = threading.Thread(
             target=self._processing_loop,
             name="DetectionProcessor",
@@ -170,6 +243,13 @@ class DetectionService:
         )
         self._processing_thread.start()
         
+        self._inference_thread = threading.Thread(
+            target=self._inference_loop,
+            name="InferenceLoop",
+            daemon=True
+        )
+        self._inference_thread.start()
+        
         self._main_thread = threading.Thread(
             target=self._capture_loop,
             name="CaptureLoop",
@@ -193,90 +273,155 @@ class DetectionService:
         if self._main_thread and self._main_thread.is_alive():
             self._main_thread.join(timeout=timeout)
         
+        if self._inference_thread and self._inference_thread.is_alive():
+            self._inference_thread.join(timeout=timeout)
+        
         if self._processing_thread and self._processing_thread.is_alive():
             self._processing_thread.join(timeout=timeout)
         
+        # Writers drain their queues before exiting
+        if self._image_writer_thread and self._image_writer_thread.is_alive():
+            self._image_writer_thread.join(timeout=timeout)
+        
+        if self._db_writer_thread and self._db_writer_thread.is_alive():
+            self._db_writer_thread.join(timeout=timeout)
+        
         if self.camera:
             self.camera.stop()
         
         if self.detector:
             self.detector.unload()
         
+        if self.database:
+            self.database.close_all()
+        
         self.state = ServiceState.STOPPED
         logger.info("Detection service stopped")
     
+    def _pin_thread(self, cores: Set[int]):
+        """Pin the calling service thread if CPU affinity is enabled."""
+        if self.config.system.cpu_affinity_enabled:
+            _pin_current_thread(cores)
+    
     def _capture_loop(self):
         """Main capture loop running in separate thread."""
+        self._pin_thread(self._io_cores)
         frame_interval = 1.0 / self.config.camera.fps
+        skip_threshold = max(1, self._inference_queue.maxsize // 2)
         
         while not self._stop_event.is_set():
             loop_start = time.perf_counter()
             
+            # Don't capture faster than inference can keep up with
+            interval = frame_interval
+            if self.detector:
+                avg_inference_s = self.detector.get_average_inference_time() / 1000
+                interval = max(frame_interval, avg_inference_s * 0.9)
+            
             try:
-                if self.camera and self.camera.is_running:
+                if self._inference_queue.qsize() >= skip_threshold:
+                    self._frames_dropped += 1
+                elif self.camera and self.camera.is_running:
                     frame = self.camera.capture()
                     
                     if frame:
                         self._frame_count += 1
-                        self._process_frame(frame)
+                        self._enqueue_frame(frame)
                 else:
                     time.sleep(0.1)
                 
             except Exception as e:
                 self._error_count += 1
-                logger.error(f"Capture loop error: {e}")
+                logger.error("Capture loop error: %s", e)
                 time.sleep(1)
             
             elapsed = time.perf_counter() - loop_start
-            sleep_time = max(0, frame_interval - elapsed)
+            sleep_time = max(0, interval - elapsed)
             if sleep_time > 0:
                 time.sleep(sleep_time)
     
-    def _process_frame(self, frame: CameraFrame):
-        """Process a single frame for detections."""
+    def _enqueue_frame(self, frame: CameraFrame):
+        """Hand a captured frame to the inference thread."""
+        try:
+            self._inference_queue.put_nowait(frame)
+        except Full:
+            self._frames_dropped += 1
+            logger.debug("Inference queue full, dropping frame")
+    
+    def _inference_loop(self):
+        """Inference loop draining captured frames in batches."""
+        self._pin_thread(self._inference_cores)
+        batch_size = max(1, self.config.detection.batch_size)
+        
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._inference_queue.get(timeout=0.05)]
+            except Empty:
+                continue
+            
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._inference_queue.get_nowait())
+                except Empty:
+                    break
+            
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                self._error_count += 1
+                logger.error("Inference loop error: %s", e)
+    
+    def _process_batch(self, frames: List[CameraFrame]):
+        """Run detection on a batch of frames and queue resulting events."""
         start_time = time.perf_counter()
         
         try:
-            detections = self.detector.detect(frame.data)
+            batch_detections = self.detector.detect_batch([frame.data for frame in frames])
             
-            processing_time = (time.perf_counter() - start_time) * 1000
+            processing_time = (time.perf_counter() - start_time) * 1000 / len(frames)
+            now = time.time()
             
-            filtered_detections = self._apply_cooldown(detections)
-            
-            if filtered_detections:
+            for frame, detections in zip(frames, batch_detections):
+                filtered_detections = self._apply_cooldown(detections, now)
+                
+                if not filtered_detections:
+                    continue
+                
                 event = DetectionEvent(
                     frame=frame,
                     detections=filtered_detections,
                     processing_time_ms=processing_time,
-                    timestamp=time.time()
+                    timestamp=now
                 )
                 
-                try:
-                    self._detection_queue.put_nowait(event)
-                except:
+                if not _offer(self._detection_queue, event, self._detection_queue_max):
                     logger.warning("Detection queue full, dropping event")
                 
         except Exception as e:
-            logger.error(f"Frame processing error: {e}")
+            logger.error("Frame processing error: %s", e)
     
-    def _apply_cooldown(self, detections: List[Detection]) -> List[Detection]:
+    def _apply_cooldown(
+        self,
+        detections: List[Detection],
+        current_time: Optional[float] = None
+    ) -> List[Detection]:
         """Filter detections based on cooldown period."""
-        cooldown = self.config.alerts.cooldown_seconds
-        current_time = time.time()
-        filtered = []
+        if not detections:
+            return detections
         
-        for detection in detections:
-            class_name = detection.class_name
-            last_time = self._last_detection_time.get(class_name, 0)
-            
-            if current_time - last_time >= cooldown:
-                filtered.append(detection)
-                self._last_detection_time[class_name] = current_time
+        if current_time is None:
+            current_time = time.time()
+        cooldown = float(self.config.alerts.cooldown_seconds)
+        class_ids = np.fromiter(
+            (d.class_id for d in detections), dtype=np.int64, count=len(detections)
+        )
+        keep = apply_cooldown(class_ids, self._last_detection_time, cooldown, current_time)
         
-        return filtered
+        return [d for d, k in zip(detections, keep) if k]
     
     def _processing_loop(self):
         """Background loop for processing detection events."""
+        self._pin_thread(self._io_cores)
         while not self._stop_event.is_set():
             try:
                 event = self._detection_queue.get(timeout=1.0)
@@ -284,21 +429,14 @@ class DetectionService:
             except Empty:
                 continue
             except Exception as e:
-                logger.error(f"Processing loop error: {e}")
+                logger.error("Processing loop error: %s", e)
     
     def _handle_detection_event(self, event: DetectionEvent):
-        """Handle a detection event - save to DB and notify callbacks."""
+        """Handle a detection event - queue image/DB writes and notify callbacks."""
+        save_images = self.config.storage.images.save_detections and self.image_store
+        
         for detection in event.detections:
             try:
-                image_path = None
-                if self.config.storage.images.save_detections and self.image_store:
-                    image_path = self.image_store.save_detection_image(
-                        image=event.frame.data,
-                        detection_id=self._detection_count,
-                        class_name=detection.class_name,
-                        draw_bbox=detection.bbox
-                    )
-                
                 record = DetectionRecord(
                     id=None,
                     device_id=self.config.device.id,
@@ -310,28 +448,98 @@ class DetectionService:
                     bbox_y1=detection.bbox[1],
                     bbox_x2=detection.bbox[2],
                     bbox_y2=detection.bbox[3],
-                    image_path=image_path,
+                    image_path=None,
                     synced=False,
                     created_at=time.time()
                 )
                 
+                if save_images:
+                    image_seq = next(self._image_seq)
+                    image_path = self.image_store.build_image_path(
+                        image_seq, detection.class_name
+                    )
+                    # The image writer fills in image_path once the file
+                    # exists and passes the record on to the DB writer
+                    if _offer(self._image_write_queue, (
+                        event.frame.data, image_seq, detection.class_name,
+                        detection.bbox, image_path, record
+                    ), self._image_write_queue_max):
+                        continue
+                    logger.warning("Image write queue full, skipping detection image")
+                
                 if self.database:
-                    record_id = self.database.insert_detection(record)
-                    if record_id:
-                        self._detection_count += 1
-                        logger.info(
-                            f"Detection #{record_id}: {detection.class_name} "
-                            f"({detection.confidence:.2f}) at {detection.bbox}"
-                        )
+                    if not _offer(self._db_write_queue, record, self._db_write_queue_max):
+                        logger.warning("Database write queue full, dropping detection record")
                 
             except Exception as e:
-                logger.error(f"Failed to handle detection: {e}")
+                logger.error("Failed to handle detection: %s", e)
         
         for callback in self._detection_callbacks:
             try:
                 callback(event)
             except Exception as e:
-                logger.error(f"Detection callback error: {e}")
+                logger.error("Detection callback error: %s", e)
+    
+    def _image_writer_loop(self):
+        """Background loop writing detection images, then queueing their records."""
+        self._pin_thread(self._io_cores)
+        try:
+            while not (self._stop_event.is_set() and self._image_write_queue.empty()):
+                try:
+                    image, image_seq, class_name, bbox, image_path, record = \
+                        self._image_write_queue.get(timeout=1.0)
+                except Empty:
+                    continue
+                
+                try:
+                    # None if the write failed, so no record points at a missing file
+                    record.image_path = self.image_store.save_detection_image(
+                        image=image,
+                        detection_id=image_seq,
+                        class_name=class_name,
+                        draw_bbox=bbox,
+                        relative_path=image_path
+                    )
+                except Exception as e:
+                    logger.error("Image writer error: %s", e)
+                
+                if self.database:
+                    if not _offer(self._db_write_queue, record, self._db_write_queue_max):
+                        logger.warning("Database write queue full, dropping detection record")
+        finally:
+            self._images_drained.set()
+    
+    def _db_writer_loop(self):
+        """Background loop committing detection records in batches."""
+        self._pin_thread(self._io_cores)
+        next_optimize = time.monotonic() + DB_OPTIMIZE_INTERVAL_SECONDS
+        while not (self._images_drained.is_set() and self._db_write_queue.empty()):
+            if time.monotonic() >= next_optimize:
+                self.database.optimize()
+                next_optimize = time.monotonic() + DB_OPTIMIZE_INTERVAL_SECONDS
+            
+            try:
+                batch = [self._db_write_queue.get(timeout=1.0)]
+            except Empty:
+                continue
+            
+            while len(batch) < self._db_write_batch_size:
+                try:
+                    batch.append(self._db_write_queue.get_nowait())
+                except Empty:
+                    break
+            
+            try:
+                record_ids = self.database.insert_detections(batch)
+                self._detection_count += len(record_ids)
+                for record_id, record in zip(record_ids, batch):
+                    logger.info(
+                        "Detection #%d: %s (%.2f) at (%d, %d, %d, %d)",
+                        record_id, record.class_name, record.confidence,
+                        record.bbox_x1, record.bbox_y1, record.bbox_x2, record.bbox_y2
+                    )
+            except Exception as e:
+                logger.error("Database writer error: %s", e)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics."""
@@ -341,6 +549,7 @@ class DetectionService:
             "state": self.state.value,
             "uptime_seconds": round(uptime, 1),
             "frame_count": self._frame_count,
+            "frames_dropped": self._frames_dropped,
             "detection_count": self._detection_count,
             "error_count": self._error_count,
             "device_id": self.config.device.id,
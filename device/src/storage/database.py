@@ -5,15 +5,56 @@ Optimized for low-resource environments with automatic cleanup.
 
 import logging
 import sqlite3
+import struct
 import time
 import threading
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from contextlib import contextmanager
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Shared by single and batched inserts so both hit the statement cache
+_INSERT_DETECTION_SQL = """
+    INSERT INTO detections 
+    (device_id, timestamp, class_id, class_name, confidence,
+     bbox, image_path, synced, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_DETECTIONS_COLUMNS = """(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    class_id INTEGER NOT NULL,
+    class_name TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    bbox BLOB NOT NULL,
+    image_path TEXT,
+    synced INTEGER DEFAULT 0,
+    created_at REAL NOT NULL
+)"""
+
+# Column order read by DetectionRecord.from_row
+_RECORD_COLUMNS = (
+    "id, device_id, timestamp, class_id, class_name, confidence, "
+    "bbox, image_path, synced, created_at"
+)
+
+# Bounding boxes are stored as four little-endian uint16 pixel coordinates
+_BBOX_STRUCT = struct.Struct("<4H")
+
+
+def _pack_bbox(x1: int, y1: int, x2: int, y2: int) -> bytes:
+    """Pack bbox coordinates into a single 8-byte BLOB."""
+    return _BBOX_STRUCT.pack(
+        min(max(int(x1), 0), 0xFFFF),
+        min(max(int(y1), 0), 0xFFFF),
+        min(max(int(x2), 0), 0xFFFF),
+        min(max(int(y2), 0), 0xFFFF)
+    )
+
 
 @dataclass
 class DetectionRecord:
@@ -45,12 +86,37 @@ class DetectionRecord:
             "synced": self.synced,
             "created_at": self.created_at
         }
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> "DetectionRecord":
+        """Build a record from a plain tuple row selected with _RECORD_COLUMNS."""
+        (record_id, device_id, timestamp, class_id, class_name, confidence,
+         bbox, image_path, synced, created_at) = row
+        return cls(
+            record_id, device_id, timestamp, class_id, class_name, confidence,
+            *_BBOX_STRUCT.unpack(bbox), image_path, bool(synced), created_at
+        )
+
+
+def _record_params(record: DetectionRecord) -> tuple:
+    """Bind parameters for _INSERT_DETECTION_SQL."""
+    return (
+        record.device_id,
+        record.timestamp,
+        record.class_id,
+        record.class_name,
+        record.confidence,
+        _pack_bbox(record.bbox_x1, record.bbox_y1, record.bbox_x2, record.bbox_y2),
+        record.image_path,
+        1 if record.synced else 0,
+        record.created_at
+    )
 
 
 class DetectionDatabase:
     """
     SQLite database manager for detection records.
-    Thread-safe with connection pooling.
+    Thread-safe with one persistent connection per thread.
     """
     
     def __init__(self, db_path: str, max_size_mb: int = 500):
@@ -58,6 +124,11 @@ class DetectionDatabase:
         self.max_size_mb = max_size_mb
         self._lock = threading.Lock()
         self._initialized = False
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        # Mirror of device_state so unchanged values are never rewritten
+        self._state_cache: Dict[str, str] = {}
         
     def initialize(self) -> bool:
         """Initialize database and create tables."""
@@ -65,7 +136,14 @@ class DetectionDatabase:
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
             
             with self._get_connection() as conn:
+                # auto_vacuum can only be changed before the first table is
+                # created; existing databases keep their mode
+                if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                # WAL is persistent in the database header, so set it once here
+                conn.execute("PRAGMA journal_mode=WAL")
                 self._create_tables(conn)
+                self._migrate_bbox_columns(conn)
                 self._create_indexes(conn)
             
             self._initialized = True
@@ -78,40 +156,57 @@ class DetectionDatabase:
     
     @contextmanager
     def _get_connection(self):
-        """Get a database connection with proper cleanup."""
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                # Reap connections left behind by threads that have exited
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._close_quietly(self._connections.pop(thread))
+                self._connections[threading.current_thread()] = conn
+        yield conn
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection and apply per-connection PRAGMAs once."""
+        # Connections are closed from other threads by close_all() and reaping
         conn = sqlite3.connect(
             str(self.db_path),
             timeout=30.0,
-            isolation_level=None
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=512
         )
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
-        conn.execute("PRAGMA cache_size=-2000")
+        # 16 MB page cache plus memory-mapped reads keep hot pages resident
+        # for the stats queries; sort/group temp tables stay in RAM
+        conn.execute("PRAGMA cache_size=-16000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def close_all(self):
+        """Close every connection opened by any thread."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            self._close_quietly(conn)
+        self._local = threading.local()
+    
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection):
+        """Close a connection, ignoring errors during shutdown."""
         try:
-            yield conn
-        finally:
             conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing database connection: {e}")
     
     def _create_tables(self, conn: sqlite3.Connection):
         """Create database tables."""
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS detections (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                device_id TEXT NOT NULL,
-                timestamp REAL NOT NULL,
-                class_id INTEGER NOT NULL,
-                class_name TEXT NOT NULL,
-                confidence REAL NOT NULL,
-                bbox_x1 INTEGER NOT NULL,
-                bbox_y1 INTEGER NOT NULL,
-                bbox_x2 INTEGER NOT NULL,
-                bbox_y2 INTEGER NOT NULL,
-                image_path TEXT,
-                synced INTEGER DEFAULT 0,
-                created_at REAL NOT NULL
-            )
-        """)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS detections {_DETECTIONS_COLUMNS}")
         
         conn.execute("""
             CREATE TABLE IF NOT EXISTS device_state (
@@ -133,11 +228,48 @@ class DetectionDatabase:
             )
         """)
     
+    def _migrate_bbox_columns(self, conn: sqlite3.Connection):
+        """Rebuild a pre-existing detections table with the packed bbox column."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(detections)")}
+        if "bbox" in columns:
+            return
+        
+        logger.info("Migrating detections table to packed bbox column")
+        conn.create_function("pack_bbox", 4, _pack_bbox)
+        # Build the new table and rename it into place, so foreign keys
+        # referencing "detections" keep pointing at the right table
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DROP TABLE IF EXISTS detections_new")
+            conn.execute(f"CREATE TABLE detections_new {_DETECTIONS_COLUMNS}")
+            conn.execute("""
+                INSERT INTO detections_new
+                (id, device_id, timestamp, class_id, class_name, confidence,
+                 bbox, image_path, synced, created_at)
+                SELECT id, device_id, timestamp, class_id, class_name, confidence,
+                       pack_bbox(bbox_x1, bbox_y1, bbox_x2, bbox_y2),
+                       image_path, synced, created_at
+                FROM detections
+            """)
+            conn.execute("DROP TABLE detections")
+            conn.execute("ALTER TABLE detections_new RENAME TO detections")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
     def _create_indexes(self, conn: sqlite3.Connection):
         """Create database indexes for performance."""
         conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON detections(timestamp)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_synced ON detections(synced)")
+        # Partial index holds only unsynced rows, already in timestamp order
+        conn.execute("DROP INDEX IF EXISTS idx_detections_synced")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_unsynced ON detections(timestamp) WHERE synced = 0"
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_class ON detections(class_name)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_detections_ts_class ON detections(timestamp, class_name)"
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_sync_queue_attempts ON sync_queue(attempts)")
     
     def insert_detection(self, record: DetectionRecord) -> Optional[int]:
@@ -145,44 +277,50 @@ class DetectionDatabase:
         with self._lock:
             try:
                 with self._get_connection() as conn:
-                    cursor = conn.execute("""
-                        INSERT INTO detections 
-                        (device_id, timestamp, class_id, class_name, confidence,
-                         bbox_x1, bbox_y1, bbox_x2, bbox_y2, image_path, synced, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        record.device_id,
-                        record.timestamp,
-                        record.class_id,
-                        record.class_name,
-                        record.confidence,
-                        record.bbox_x1,
-                        record.bbox_y1,
-                        record.bbox_x2,
-                        record.bbox_y2,
-                        record.image_path,
-                        1 if record.synced else 0,
-                        record.created_at
-                    ))
+                    cursor = conn.execute(_INSERT_DETECTION_SQL, _record_params(record))
                     return cursor.lastrowid
             except Exception as e:
                 logger.error(f"Failed to insert detection: {e}")
                 return None
     
+    def insert_detections(self, records: List[DetectionRecord]) -> List[int]:
+        """Insert detection records in a single transaction and return their IDs."""
+        if not records:
+            return []
+        
+        with self._lock:
+            try:
+                with self._get_connection() as conn:
+                    # IMMEDIATE takes the write lock up front, so the
+                    # AUTOINCREMENT ids of this batch are contiguous
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany(
+                            _INSERT_DETECTION_SQL, (_record_params(r) for r in records)
+                        )
+                        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                    return list(range(last_id - len(records) + 1, last_id + 1))
+            except Exception as e:
+                logger.error(f"Failed to insert {len(records)} detections: {e}")
+                return []
+    
     def get_unsynced_detections(self, limit: int = 100) -> List[DetectionRecord]:
         """Get detections that haven't been synced to dashboard."""
         records = []
         try:
             with self._get_connection() as conn:
-                rows = conn.execute("""
-                    SELECT * FROM detections 
+                rows = conn.execute(f"""
+                    SELECT {_RECORD_COLUMNS} FROM detections 
                     WHERE synced = 0 
                     ORDER BY timestamp ASC 
                     LIMIT ?
                 """, (limit,)).fetchall()
                 
-                for row in rows:
-                    records.append(self._row_to_record(row))
+                records = [DetectionRecord.from_row(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get unsynced detections: {e}")
         return records
@@ -210,15 +348,14 @@ class DetectionDatabase:
         
         try:
             with self._get_connection() as conn:
-                rows = conn.execute("""
-                    SELECT * FROM detections 
+                rows = conn.execute(f"""
+                    SELECT {_RECORD_COLUMNS} FROM detections 
                     WHERE timestamp > ? 
                     ORDER BY timestamp DESC 
                     LIMIT ?
                 """, (cutoff, limit)).fetchall()
                 
-                for row in rows:
-                    records.append(self._row_to_record(row))
+                records = [DetectionRecord.from_row(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get recent detections: {e}")
         return records
@@ -251,32 +388,43 @@ class DetectionDatabase:
                     ORDER BY count DESC
                 """, (cutoff,)).fetchall()
                 
-                for row in rows:
-                    distribution[row['class_name']] = row['count']
+                distribution = dict(rows)
         except Exception as e:
             logger.error(f"Failed to get class distribution: {e}")
         return distribution
     
     def set_state(self, key: str, value: str):
-        """Set a device state value."""
+        """Set a device state value, skipping the write if it is unchanged."""
         with self._lock:
+            if self._state_cache.get(key) == value:
+                return
             try:
                 with self._get_connection() as conn:
                     conn.execute("""
-                        INSERT OR REPLACE INTO device_state (key, value, updated_at)
+                        INSERT INTO device_state (key, value, updated_at)
                         VALUES (?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            value = excluded.value,
+                            updated_at = excluded.updated_at
                     """, (key, value, time.time()))
+                self._state_cache[key] = value
             except Exception as e:
                 logger.error(f"Failed to set state {key}: {e}")
     
     def get_state(self, key: str, default: str = "") -> str:
         """Get a device state value."""
+        cached = self._state_cache.get(key)
+        if cached is not None:
+            return cached
         try:
             with self._get_connection() as conn:
                 row = conn.execute("""
                     SELECT value FROM device_state WHERE key = ?
                 """, (key,)).fetchone()
-                return row['value'] if row else default
+                if row is None:
+                    return default
+                self._state_cache[key] = row[0]
+                return row[0]
         except Exception as e:
             logger.error(f"Failed to get state {key}: {e}")
             return default
@@ -294,7 +442,11 @@ class DetectionDatabase:
                     """, (cutoff,))
                     deleted = cursor.rowcount
                     
-                    conn.execute("VACUUM")
+                    # Reclaim freed pages incrementally instead of rewriting
+                    # the whole file; the pragma runs as rows are stepped
+                    conn.execute("PRAGMA incremental_vacuum(1000)").fetchall()
+                    # Re-sample statistics for the table just thinned out
+                    conn.execute("PRAGMA optimize")
                     
                 if deleted > 0:
                     logger.info(f"Cleaned up {deleted} old detection records")
@@ -303,6 +455,15 @@ class DetectionDatabase:
         
         return deleted
     
+    def optimize(self):
+        """Refresh query planner statistics where SQLite deems them stale."""
+        with self._lock:
+            try:
+                with self._get_connection() as conn:
+                    conn.execute("PRAGMA optimize")
+            except Exception as e:
+                logger.error(f"Failed to optimize database: {e}")
+    
     def get_database_size_mb(self) -> float:
         """Get current database size in MB."""
         try:
@@ -312,31 +473,29 @@ class DetectionDatabase:
             pass
         return 0.0
     
-    def _row_to_record(self, row: sqlite3.Row) -> DetectionRecord:
-        """Convert database row to DetectionRecord."""
-        return DetectionRecord(
-            id=row['id'],
-            device_id=row['device_id'],
-            timestamp=row['timestamp'],
-            class_id=row['class_id'],
-            class_name=row['class_name'],
-            confidence=row['confidence'],
-            bbox_x1=row['bbox_x1'],
-            bbox_y1=row['bbox_y1'],
-            bbox_x2=row['bbox_x2'],
-            bbox_y2=row['bbox_y2'],
-            image_path=row['image_path'],
-            synced=bool(row['synced']),
-            created_at=row['created_at']
-        )
+    def _get_counts(self) -> Tuple[int, int]:
+        """Get total and unsynced detection counts in one query."""
+        try:
+            with self._get_connection() as conn:
+                # The unsynced count is answered from the idx_unsynced partial index
+                row = conn.execute("""
+                    SELECT
+                        (SELECT COUNT(*) FROM detections),
+                        (SELECT COUNT(*) FROM detections WHERE synced = 0)
+                """).fetchone()
+                return row[0], row[1]
+        except Exception as e:
+            logger.error(f"Failed to get detection counts: {e}")
+            return 0, 0
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
+        total, unsynced = self._get_counts()
         return {
             "initialized": self._initialized,
             "path": str(self.db_path),
             "size_mb": round(self.get_database_size_mb(), 2),
             "max_size_mb": self.max_size_mb,
-            "total_detections": self.get_detection_count(hours=24*365),
-            "unsynced_count": len(self.get_unsynced_detections(limit=1000))
+            "total_detections": total,
+            "unsynced_count": unsynced
         }
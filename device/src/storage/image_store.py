@@ -3,6 +3,7 @@ Image storage manager for detection snapshots.
 Handles saving, compression, and automatic cleanup.
 """
 
+import itertools
 import logging
 import time
 import io
@@ -15,8 +16,36 @@ import threading
 
 import numpy as np
 
+try:
+    import simplejpeg as _simplejpeg
+except ImportError:
+    _simplejpeg = None
+
+try:
+    import cv2 as _cv2
+except ImportError:
+    _cv2 = None
+
 logger = logging.getLogger(__name__)
 
+# Rescan the image tree at most this often; saves and cleanup keep the
+# cached total current in between
+SIZE_CACHE_TTL_SECONDS = 60.0
+
+
+def _encode_jpeg(image: np.ndarray, quality: int) -> bytes:
+    """Encode an RGB image to JPEG, using libjpeg-turbo via simplejpeg if available."""
+    if _simplejpeg is not None:
+        return _simplejpeg.encode_jpeg(
+            np.ascontiguousarray(image), quality=quality, colorspace="RGB"
+        )
+    
+    from PIL import Image
+    
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
 
 class ImageStore:
     """
@@ -36,7 +65,11 @@ class ImageStore:
         self.max_storage_mb = max_storage_mb
         self.cleanup_days = cleanup_days
         self._lock = threading.Lock()
+        # next() on itertools.count is atomic under the GIL, so saves need no lock
+        self._saved_counter = itertools.count(1)
         self._total_saved = 0
+        self._cached_size_bytes: Optional[int] = None
+        self._cached_size_at = 0.0
     
     def initialize(self) -> bool:
         """Initialize image storage directory."""
@@ -48,12 +81,29 @@ class ImageStore:
             logger.error(f"Failed to initialize image store: {e}")
             return False
     
+    def build_image_path(self, detection_id: int, class_name: str) -> str:
+        """
+        Build the relative path a detection image will be saved under.
+        
+        Lets callers queue the write with its path; the path only belongs in
+        a detection record once save_detection_image has returned it.
+        """
+        now = datetime.now()
+        return f"{now.strftime('%Y-%m-%d')}/{now.strftime('%H%M%S')}_{detection_id}_{class_name}.jpg"
+    
+    def _prepare_path(self, relative_path: str) -> Path:
+        """Resolve a relative image path and ensure its folder exists."""
+        filepath = self.base_path / relative_path
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        return filepath
+    
     def save_detection_image(
         self,
         image: np.ndarray,
         detection_id: int,
         class_name: str,
-        draw_bbox: Optional[Tuple[int, int, int, int]] = None
+        draw_bbox: Optional[Tuple[int, int, int, int]] = None,
+        relative_path: Optional[str] = None
     ) -> Optional[str]:
         """
         Save a detection image with optional bounding box overlay.
@@ -63,67 +113,77 @@ class ImageStore:
             detection_id: Database ID of the detection
             class_name: Detected class name
             draw_bbox: Optional (x1, y1, x2, y2) to draw on image
+            relative_path: Optional path from build_image_path() to save under
             
         Returns:
             Relative path to saved image or None on failure
         """
+        relative_path = relative_path or self.build_image_path(detection_id, class_name)
         try:
-            from PIL import Image, ImageDraw
-            
-            date_folder = datetime.now().strftime("%Y-%m-%d")
-            save_dir = self.base_path / date_folder
-            save_dir.mkdir(parents=True, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%H%M%S")
-            filename = f"{timestamp}_{detection_id}_{class_name}.jpg"
-            filepath = save_dir / filename
-            
-            pil_image = Image.fromarray(image)
+            filepath = self._prepare_path(relative_path)
             
             if draw_bbox:
-                draw = ImageDraw.Draw(pil_image)
-                x1, y1, x2, y2 = draw_bbox
-                draw.rectangle([x1, y1, x2, y2], outline="red", width=2)
-                draw.text((x1, y1 - 15), class_name, fill="red")
+                image = self._draw_bbox(image, draw_bbox, class_name)
             
-            pil_image.save(filepath, "JPEG", quality=self.jpeg_quality)
+            filepath.write_bytes(_encode_jpeg(image, self.jpeg_quality))
             
-            with self._lock:
-                self._total_saved += 1
+            self._total_saved = next(self._saved_counter)
+            self._adjust_cached_size(filepath.stat().st_size)
             
-            relative_path = f"{date_folder}/{filename}"
             logger.debug(f"Saved detection image: {relative_path}")
             return relative_path
             
         except ImportError:
             logger.warning("PIL not available, saving raw image")
-            return self._save_raw_image(image, detection_id, class_name)
+            return self._save_raw_image(image, relative_path)
         except Exception as e:
             logger.error(f"Failed to save detection image: {e}")
             return None
     
-    def _save_raw_image(
+    def _draw_bbox(
         self,
         image: np.ndarray,
-        detection_id: int,
+        bbox: Tuple[int, int, int, int],
         class_name: str
+    ) -> np.ndarray:
+        """Return a copy of the image with the bounding box and label drawn on."""
+        x1, y1, x2, y2 = (int(v) for v in bbox)
+        red = (255, 0, 0)
+        
+        if _cv2 is not None:
+            # Copy so callbacks sharing the frame never see the overlay
+            canvas = image.copy()
+            _cv2.rectangle(canvas, (x1, y1), (x2, y2), red, 2)
+            _cv2.putText(
+                canvas, class_name, (x1, max(y1 - 6, 12)),
+                _cv2.FONT_HERSHEY_SIMPLEX, 0.5, red, 1, _cv2.LINE_AA
+            )
+            return canvas
+        
+        from PIL import Image, ImageDraw
+        
+        pil_image = Image.fromarray(image)
+        draw = ImageDraw.Draw(pil_image)
+        draw.rectangle([x1, y1, x2, y2], outline=red, width=2)
+        draw.text((x1, y1 - 15), class_name, fill=red)
+        return np.asarray(pil_image)
+    
+    def _save_raw_image(
+        self,
+        image: np.ndarray,
+        relative_path: str
     ) -> Optional[str]:
         """Fallback: save image using OpenCV."""
         try:
             import cv2
             
-            date_folder = datetime.now().strftime("%Y-%m-%d")
-            save_dir = self.base_path / date_folder
-            save_dir.mkdir(parents=True, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%H%M%S")
-            filename = f"{timestamp}_{detection_id}_{class_name}.jpg"
-            filepath = save_dir / filename
+            filepath = self._prepare_path(relative_path)
             
             bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
             cv2.imwrite(str(filepath), bgr_image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            self._adjust_cached_size(filepath.stat().st_size)
             
-            return f"{date_folder}/{filename}"
+            return relative_path
         except Exception as e:
             logger.error(f"Failed to save raw image: {e}")
             return None
@@ -144,34 +204,46 @@ class ImageStore:
             if not full_path.exists():
                 return None
             
-            img = Image.open(full_path)
+            img = Image.open(full_path).convert("RGB")
+            budget = max_size_kb * 1024
             
-            quality = self.jpeg_quality
-            while quality > 10:
-                buffer = io.BytesIO()
-                img.save(buffer, format="JPEG", quality=quality)
-                size_kb = buffer.tell() / 1024
-                
-                if size_kb <= max_size_kb:
-                    buffer.seek(0)
-                    return base64.b64encode(buffer.read()).decode('utf-8')
-                
-                quality -= 10
-                
-                if quality <= 30:
-                    new_size = (img.width // 2, img.height // 2)
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-                    quality = 50
+            # Try full resolution, then half resolution once
+            for _ in range(2):
+                data = self._encode_within_budget(np.asarray(img), budget)
+                if data is not None:
+                    return base64.b64encode(data).decode('utf-8')
+                new_size = (img.width // 2, img.height // 2)
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
             
-            buffer = io.BytesIO()
-            img.save(buffer, format="JPEG", quality=20)
-            buffer.seek(0)
-            return base64.b64encode(buffer.read()).decode('utf-8')
+            return base64.b64encode(_encode_jpeg(np.asarray(img), 10)).decode('utf-8')
             
         except Exception as e:
             logger.error(f"Failed to get image as base64: {e}")
             return None
     
+    def _encode_within_budget(self, pixels: np.ndarray, budget: int) -> Optional[bytes]:
+        """
+        Find the highest JPEG quality whose output fits within budget bytes.
+        
+        JPEG size grows monotonically with quality, so bisect over
+        [10, jpeg_quality] instead of stepping down linearly.
+        """
+        data = _encode_jpeg(pixels, self.jpeg_quality)
+        if len(data) <= budget:
+            return data
+        
+        best = None
+        lo, hi = 10, self.jpeg_quality - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            data = _encode_jpeg(pixels, mid)
+            if len(data) <= budget:
+                best = data
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return best
+    
     def cleanup_old_images(self) -> Tuple[int, float]:
         """
         Remove images older than cleanup_days.
@@ -184,29 +256,45 @@ class ImageStore:
         cutoff_time = time.time() - (self.cleanup_days * 86400)
         
         try:
-            for date_folder in self.base_path.iterdir():
-                if not date_folder.is_dir():
-                    continue
-                
-                for image_file in date_folder.iterdir():
-                    if image_file.stat().st_mtime < cutoff_time:
-                        file_size = image_file.stat().st_size
-                        image_file.unlink()
-                        files_deleted += 1
-                        bytes_freed += file_size
-                
-                if not any(date_folder.iterdir()):
-                    date_folder.rmdir()
-            
-            if files_deleted > 0:
-                mb_freed = bytes_freed / (1024 * 1024)
-                logger.info(f"Cleaned up {files_deleted} images, freed {mb_freed:.2f} MB")
-                return files_deleted, mb_freed
+            with os.scandir(self.base_path) as date_folders:
+                for date_folder in date_folders:
+                    if not date_folder.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    # One pass per folder: a single stat gives both mtime and
+                    # size, and the kept count tells whether it is now empty
+                    kept = 0
+                    with os.scandir(date_folder.path) as image_files:
+                        for image_file in image_files:
+                            # Anything but a plain file is left alone
+                            if not image_file.is_file(follow_symlinks=False):
+                                kept += 1
+                                continue
+                            try:
+                                st = image_file.stat(follow_symlinks=False)
+                                if st.st_mtime < cutoff_time:
+                                    os.unlink(image_file.path)
+                                    files_deleted += 1
+                                    bytes_freed += st.st_size
+                                else:
+                                    kept += 1
+                            except OSError as e:
+                                kept += 1
+                                logger.warning(f"Could not remove {image_file.path}: {e}")
+                    
+                    if kept == 0:
+                        os.rmdir(date_folder.path)
                 
         except Exception as e:
             logger.error(f"Failed to cleanup old images: {e}")
         
-        return files_deleted, bytes_freed / (1024 * 1024)
+        # Also after a partial pass, so the cached total matches the disk
+        self._adjust_cached_size(-bytes_freed)
+        
+        mb_freed = bytes_freed / (1024 * 1024)
+        if files_deleted > 0:
+            logger.info(f"Cleaned up {files_deleted} images, freed {mb_freed:.2f} MB")
+        return files_deleted, mb_freed
     
     def check_storage_limit(self) -> bool:
         """
@@ -223,18 +311,41 @@ class ImageStore:
         return False
     
     def get_storage_size_mb(self) -> float:
-        """Get total storage used in MB."""
-        total_size = 0
+        """Get total storage used in MB, rescanning at most once per TTL."""
+        now = time.monotonic()
+        with self._lock:
+            if self._cached_size_bytes is not None and now - self._cached_size_at < SIZE_CACHE_TTL_SECONDS:
+                return self._cached_size_bytes / (1024 * 1024)
+        
         try:
-            for root, dirs, files in os.walk(self.base_path):
-                for file in files:
-                    filepath = Path(root) / file
-                    total_size += filepath.stat().st_size
+            total_size = self._scan_size(self.base_path)
         except Exception as e:
             logger.error(f"Failed to calculate storage size: {e}")
+            total_size = self._cached_size_bytes or 0
+        else:
+            with self._lock:
+                self._cached_size_bytes = total_size
+                self._cached_size_at = now
         
         return total_size / (1024 * 1024)
     
+    def _scan_size(self, path) -> int:
+        """Sum file sizes under path using directory entry metadata."""
+        total = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += self._scan_size(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+        return total
+    
+    def _adjust_cached_size(self, delta_bytes: int):
+        """Keep the cached storage total current without rescanning."""
+        with self._lock:
+            if self._cached_size_bytes is not None:
+                self._cached_size_bytes = max(0, self._cached_size_bytes + delta_bytes)
+    
     def get_stats(self) -> dict:
         """Get image store statistics."""
         return {
@@ -1,16 +1,180 @@
 """
 Logging configuration for OPTIC-SHIELD.
-Supports console and file logging with rotation.
+Supports console and file logging with rotation, written from a background thread.
 """
 
+import atexit
 import logging
+import os
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Optional
 
 from ..core.config import Config
 
+# Records waiting for the listener thread; beyond this they are dropped
+# rather than blocking the logging thread on a stalled disk
+LOG_QUEUE_SIZE = 10000
+
+# Log file write buffer; flushed once each burst of queued records drains
+LOG_WRITE_BUFFER = 65536
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_DroppingQueueHandler"] = None
+# Settings the current handlers were built from
+_fingerprint: Optional[tuple] = None
+
+
+def _dropped_record(count: int) -> logging.LogRecord:
+    """Build the warning that reports records lost to a full queue."""
+    return logging.LogRecord(
+        __name__, logging.WARNING, __file__, 0,
+        "Log queue full: dropped %d log records", (count,), None
+    )
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records instead of erroring when the queue is full.
+    
+    The loss is reported with a warning once the queue has room again,
+    and any still unreported count is logged by stop_logging().
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped != self._reported:
+            try:
+                self.queue.put_nowait(
+                    self.prepare(_dropped_record(self.dropped - self._reported))
+                )
+            except queue.Full:
+                return
+            self._reported = self.dropped
+    
+    def take_unreported(self) -> int:
+        """Return the drops not yet reported, marking them reported."""
+        with self.lock:
+            count = self.dropped - self._reported
+            self._reported = self.dropped
+        return count
+
+
+class _BlockingStopListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue."""
+    
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a large buffer.
+    
+    Flushes only when `pending` reports no more records waiting, so a
+    burst is written with one flush instead of one per record.
+    """
+    
+    def __init__(self, *args, pending: Optional[Callable[[], bool]] = None, **kwargs):
+        self._pending = pending
+        # Size of the current file including buffered writes; the base
+        # class seeks to find it, and that seek flushes the buffer
+        self._bytes = 0
+        super().__init__(*args, **kwargs)
+    
+    def _open(self):
+        stream = open(
+            self.baseFilename, self.mode, buffering=LOG_WRITE_BUFFER,
+            encoding=self.encoding, errors=self.errors
+        )
+        self._bytes = os.fstat(stream.fileno()).st_size
+        return stream
+    
+    def _encoded_size(self, msg: str) -> int:
+        if msg.isascii():
+            return len(msg)
+        return len(msg.encode(self.encoding or "utf-8", self.errors or "strict"))
+    
+    def _needs_rollover(self, size: int) -> bool:
+        return 0 < self.maxBytes <= self._bytes + size and self._bytes > 0
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        return self._needs_rollover(self._encoded_size(self.format(record) + self.terminator))
+    
+    def doRollover(self):
+        super().doRollover()
+        # Reopened files set the count in _open; delayed ones start empty
+        if self.stream is None:
+            self._bytes = 0
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            # Formatted once, and sized for rollover without touching the file
+            msg = self.format(record) + self.terminator
+            size = self._encoded_size(msg)
+            if self._needs_rollover(size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._bytes += size
+            if self._pending is None or not self._pending():
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def rotate(self, source: str, dest: str):
+        if callable(self.rotator):
+            self.rotator(source, dest)
+        elif os.path.exists(source):
+            # Replaces dest in one step, also on Windows
+            os.replace(source, dest)
+
+
+def _trim_record_fields(fmt: str):
+    """
+    Skip thread/process LogRecord fields the format string never prints.
+    
+    Uses logging's documented module flags, which apply process-wide;
+    only called when logging.trim_record_fields is enabled.
+    """
+    logging.logThreads = "%(thread" in fmt
+    logging.logProcesses = "%(process" in fmt
+    logging.logMultiprocessing = "%(processName)" in fmt
+
+
+def stop_logging():
+    """Flush queued records and stop the background logging thread."""
+    global _listener, _queue_handler, _fingerprint
+    if _listener is not None:
+        _listener.stop()
+        dropped = _queue_handler.take_unreported() if _queue_handler else 0
+        for handler in _listener.handlers:
+            if dropped:
+                # The listener is gone; write the final count directly
+                handler.handle(_dropped_record(dropped))
+            handler.close()
+        _listener = None
+    _queue_handler = None
+    _fingerprint = None
+
 
 def setup_logging(config: Config) -> logging.Logger:
     """
@@ -22,33 +186,62 @@ def setup_logging(config: Config) -> logging.Logger:
     Returns:
         Root logger instance
     """
+    global _listener, _queue_handler, _fingerprint
+    
     log_config = config.logging
     
     root_logger = logging.getLogger()
+    
+    fingerprint = (
+        log_config.level, log_config.format, log_config.console, log_config.file,
+        log_config.file_path, log_config.trim_record_fields,
+        config.storage.logs_max_size_mb, str(config.get_base_path())
+    )
+    if _listener is not None and fingerprint == _fingerprint:
+        # Same settings: keep the open log file and any queued records
+        return root_logger
+    
     root_logger.setLevel(getattr(logging, log_config.level.upper(), logging.INFO))
     
-    root_logger.handlers.clear()
+    stop_logging()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+    handlers = []
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
     
     formatter = logging.Formatter(log_config.format)
+    if log_config.trim_record_fields:
+        _trim_record_fields(log_config.format)
     
     if log_config.console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
         console_handler.setLevel(getattr(logging, log_config.level.upper(), logging.INFO))
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     if log_config.file:
         log_path = config.get_base_path() / log_config.file_path
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
-        file_handler = RotatingFileHandler(
+        file_handler = BufferedRotatingFileHandler(
             log_path,
             maxBytes=config.storage.logs_max_size_mb * 1024 * 1024,
-            backupCount=5
+            backupCount=5,
+            pending=lambda: not log_queue.empty()
         )
         file_handler.setFormatter(formatter)
         file_handler.setLevel(getattr(logging, log_config.level.upper(), logging.INFO))
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if handlers:
+        # Application threads only enqueue records; formatting, writes and
+        # rotation happen on the listener thread
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        root_logger.addHandler(_queue_handler)
+        _listener = _BlockingStopListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _fingerprint = fingerprint
     
     logging.getLogger("ultralytics").setLevel(logging.WARNING)
     logging.getLogger("PIL").setLevel(logging.WARNING)
@@ -56,6 +249,9 @@ def setup_logging(config: Config) -> logging.Logger:
     return root_logger
 
 
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the specified name."""
     return logging.getLogger(name)
@@ -5,16 +5,22 @@ Automatically detects OS type, user groups, paths, and hardware capabilities.
 
 import os
 import sys
+import functools
 import platform
+import shutil
 import subprocess
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Hardware probes are I/O bound; a few threads cover the slow ones
+HARDWARE_PROBE_WORKERS = 4
+
 
 class OSType(Enum):
     """Supported operating system types."""
@@ -36,7 +42,22 @@ class Architecture(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older versions keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+_ARCH_MAP: Dict[str, Architecture] = {
+    "aarch64": Architecture.ARM64,
+    "arm64": Architecture.ARM64,
+    "x86_64": Architecture.X86_64,
+    "amd64": Architecture.X86_64,
+    "i386": Architecture.X86,
+    "i686": Architecture.X86,
+    "x86": Architecture.X86,
+}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class UserInfo:
     """User and group information."""
 
@@ -46,10 +67,14 @@ class UserInfo:
     home_dir: str
     groups: List[str] = field(default_factory=list)
     is_root: bool = False
+    _groups_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_groups_set", frozenset(self.groups))
 
     def has_group(self, group_name: str) -> bool:
         """Check if user belongs to a specific group."""
-        return group_name in self.groups
+        return group_name in self._groups_set
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -62,7 +87,7 @@ class UserInfo:
         }
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class SystemInfo:
     """System hardware and software information."""
 
@@ -75,22 +100,30 @@ class SystemInfo:
     kernel: str
     hostname: str
     python_version: str
+    _dict: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(
+            self,
+            "_dict",
+            {
+                "os_type": self.os_type.value,
+                "os_name": self.os_name,
+                "os_version": self.os_version,
+                "architecture": self.architecture.value,
+                "cpu_count": self.cpu_count,
+                "memory_gb": round(self.memory_gb, 2),
+                "kernel": self.kernel,
+                "hostname": self.hostname,
+                "python_version": self.python_version,
+            },
+        )
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "os_type": self.os_type.value,
-            "os_name": self.os_name,
-            "os_version": self.os_version,
-            "architecture": self.architecture.value,
-            "cpu_count": self.cpu_count,
-            "memory_gb": round(self.memory_gb, 2),
-            "kernel": self.kernel,
-            "hostname": self.hostname,
-            "python_version": self.python_version,
-        }
+        return dict(self._dict)
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class PathInfo:
     """Path configuration based on platform."""
 
@@ -100,19 +133,28 @@ class PathInfo:
     config_dir: Path
     models_dir: Path
     venv_dir: Path
+    _dict: Dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Paths never change after construction; convert them once
+        object.__setattr__(
+            self,
+            "_dict",
+            {
+                "install_dir": os.fspath(self.install_dir),
+                "data_dir": os.fspath(self.data_dir),
+                "log_dir": os.fspath(self.log_dir),
+                "config_dir": os.fspath(self.config_dir),
+                "models_dir": os.fspath(self.models_dir),
+                "venv_dir": os.fspath(self.venv_dir),
+            },
+        )
 
     def to_dict(self) -> Dict[str, str]:
-        return {
-            "install_dir": str(self.install_dir),
-            "data_dir": str(self.data_dir),
-            "log_dir": str(self.log_dir),
-            "config_dir": str(self.config_dir),
-            "models_dir": str(self.models_dir),
-            "venv_dir": str(self.venv_dir),
-        }
+        return dict(self._dict)
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class HardwareCapabilities:
     """Hardware capability detection results."""
 
@@ -123,17 +165,313 @@ class HardwareCapabilities:
     has_spi: bool = False
     can_run_ncnn: bool = False
     gpu_available: bool = False
+    _dict: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(
+            self,
+            "_dict",
+            {
+                "has_camera": self.has_camera,
+                "camera_type": self.camera_type,
+                "has_gpio": self.has_gpio,
+                "has_i2c": self.has_i2c,
+                "has_spi": self.has_spi,
+                "can_run_ncnn": self.can_run_ncnn,
+                "gpu_available": self.gpu_available,
+            },
+        )
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "has_camera": self.has_camera,
-            "camera_type": self.camera_type,
-            "has_gpio": self.has_gpio,
-            "has_i2c": self.has_i2c,
-            "has_spi": self.has_spi,
-            "can_run_ncnn": self.can_run_ncnn,
-            "gpu_available": self.gpu_available,
-        }
+        return dict(self._dict)
+
+
+# -----------------------------------------------------------------------------
+# Cached probes
+#
+# Results are pure functions of the machine, so each probe runs once per
+# process; they are cleared in forked children, which may differ (e.g.
+# after dropping privileges).
+# -----------------------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_raspberry_pi() -> bool:
+    """Check if running on a Raspberry Pi."""
+    # The device-tree model string is a few dozen bytes; try it first
+    try:
+        with open("/proc/device-tree/model", "rb") as f:
+            if b"raspberry pi" in f.read(64).lower():
+                return True
+    except OSError:
+        pass
+
+    # Fall back to /proc/cpuinfo. On ARM the Hardware/Model lines follow
+    # the per-core blocks, so read all of it; it is only a few KB
+    try:
+        with open("/proc/cpuinfo", "rb") as f:
+            cpuinfo = f.read().lower()
+        if b"raspberry pi" in cpuinfo or b"bcm" in cpuinfo:
+            return True
+    except OSError:
+        pass
+
+    # Check for Raspberry Pi specific files
+    rpi_indicators = ["/opt/vc/bin/vcgencmd", "/sys/firmware/devicetree/base/model"]
+    for indicator in rpi_indicators:
+        if os.path.exists(indicator):
+            return True
+
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_architecture() -> Architecture:
+    """Detect CPU architecture."""
+    machine = platform.machine().lower()
+    arch = _ARCH_MAP.get(machine)
+    if arch is not None:
+        return arch
+    # Catch-all for armv6l, armv7l and other 32-bit ARM variants
+    return Architecture.ARM32 if machine.startswith("arm") else Architecture.UNKNOWN
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_macos_version() -> str:
+    """Get the macOS product version from the system plist."""
+    try:
+        import plistlib
+
+        with open("/System/Library/CoreServices/SystemVersion.plist", "rb") as f:
+            return plistlib.load(f).get("ProductVersion", "")
+    except Exception:
+        return platform.mac_ver()[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_windows_version() -> str:
+    """Get the Windows version as major.minor.build."""
+    try:
+        import ctypes
+
+        c_ulong = ctypes.c_ulong
+
+        # RtlGetVersion is not subject to the manifest-based version lie
+        # of GetVersionEx and needs no registry walk
+        class RTL_OSVERSIONINFOW(ctypes.Structure):
+            _fields_ = [
+                ("dwOSVersionInfoSize", c_ulong),
+                ("dwMajorVersion", c_ulong),
+                ("dwMinorVersion", c_ulong),
+                ("dwBuildNumber", c_ulong),
+                ("dwPlatformId", c_ulong),
+                ("szCSDVersion", ctypes.c_wchar * 128),
+            ]
+
+        info = RTL_OSVERSIONINFOW()
+        info.dwOSVersionInfoSize = ctypes.sizeof(RTL_OSVERSIONINFOW)
+        if ctypes.windll.ntdll.RtlGetVersion(ctypes.byref(info)) == 0:
+            return f"{info.dwMajorVersion}.{info.dwMinorVersion}.{info.dwBuildNumber}"
+    except Exception:
+        pass
+    return platform.win32_ver()[0]
+
+
+_OS_RELEASE_KEYS = frozenset(("PRETTY_NAME", "NAME", "VERSION_ID"))
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_linux_distro_info() -> tuple:
+    """Get Linux distribution name and version."""
+    try:
+        info = {}
+        with open("/etc/os-release", "r") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and key in _OS_RELEASE_KEYS:
+                    info[key] = value.strip('"')
+                    # NAME is only a fallback for a missing PRETTY_NAME
+                    if "PRETTY_NAME" in info and "VERSION_ID" in info:
+                        break
+
+        name = info.get("PRETTY_NAME", info.get("NAME", "Linux"))
+        version = info.get("VERSION_ID", "")
+        return name, version
+    except Exception:
+        return "Linux", ""
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_memory_gb(windows: bool) -> float:
+    """Get total system memory in GB."""
+    if windows:
+        try:
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            c_ulong = ctypes.c_ulong
+            c_ulonglong = ctypes.c_ulonglong
+
+            # The Ex variant reports 64-bit totals; GlobalMemoryStatus
+            # saturates above 4 GB
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", c_ulong),
+                    ("dwMemoryLoad", c_ulong),
+                    ("ullTotalPhys", c_ulonglong),
+                    ("ullAvailPhys", c_ulonglong),
+                    ("ullTotalPageFile", c_ulonglong),
+                    ("ullAvailPageFile", c_ulonglong),
+                    ("ullTotalVirtual", c_ulonglong),
+                    ("ullAvailVirtual", c_ulonglong),
+                    ("ullAvailExtendedVirtual", c_ulonglong),
+                ]
+
+            memory_status = MEMORYSTATUSEX()
+            memory_status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if not kernel32.GlobalMemoryStatusEx(ctypes.byref(memory_status)):
+                return 0.0
+            return memory_status.ullTotalPhys / (1024**3)
+        except Exception:
+            return 0.0
+    else:
+        try:
+            # MemTotal is always the first line
+            with open("/proc/meminfo", "rb") as f:
+                head = f.read(64)
+            if head.startswith(b"MemTotal:"):
+                kb = int(head.split(b":", 1)[1].split()[0])
+                return kb / (1024**2)
+        except Exception:
+            pass
+
+        # Fallback for macOS, without spawning sysctl(8)
+        try:
+            return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024**3)
+        except (ValueError, OSError, AttributeError):
+            pass
+
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL("libc.dylib", use_errno=True)
+            memsize = ctypes.c_uint64(0)
+            size = ctypes.c_size_t(ctypes.sizeof(memsize))
+            if (
+                libc.sysctlbyname(
+                    b"hw.memsize", ctypes.byref(memsize), ctypes.byref(size), None, 0
+                )
+                == 0
+            ):
+                return memsize.value / (1024**3)
+        except Exception:
+            pass
+
+    return 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_dev_entries() -> FrozenSet[str]:
+    """List the names in /dev once; every device node check filters this."""
+    try:
+        with os.scandir("/dev") as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def _has_device_node(prefix: str) -> bool:
+    """Check whether any /dev entry starts with prefix."""
+    return any(name.startswith(prefix) for name in _probe_dev_entries())
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_pi_camera() -> bool:
+    """Check if a Pi Camera is attached."""
+    try:
+        # Check libcamera
+        result = subprocess.run(
+            ["libcamera-hello", "--list-cameras"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        if result.returncode == 0 and "Available cameras" in result.stdout:
+            return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+
+    # Check legacy camera interface
+    try:
+        result = subprocess.run(
+            ["vcgencmd", "get_camera"], capture_output=True, text=True, timeout=5
+        )
+        if result.returncode == 0 and "detected=1" in result.stdout:
+            return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_videocore() -> bool:
+    """Check if the VideoCore GPU is reachable."""
+    # vcgencmd talks to the firmware through /dev/vchiq, and the device
+    # tree marks the GPU node enabled; either answers without a fork
+    if os.path.exists("/dev/vchiq"):
+        return True
+    try:
+        with open("/proc/device-tree/soc/gpu/status", "rb") as f:
+            if f.read(16).startswith(b"okay"):
+                return True
+    except OSError:
+        pass
+
+    try:
+        result = subprocess.run(
+            ["vcgencmd", "get_mem", "gpu"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        return result.returncode == 0
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_cuda() -> bool:
+    """Check if CUDA is usable."""
+    # Importing torch takes seconds; only pay for it when an NVIDIA
+    # driver is actually installed
+    if not (
+        shutil.which("nvidia-smi")
+        or os.path.exists("/proc/driver/nvidia/version")
+        or os.path.exists("/dev/nvidia0")
+    ):
+        return False
+
+    try:
+        import torch
+
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+_PROBES = (
+    _probe_raspberry_pi,
+    _probe_architecture,
+    _probe_linux_distro_info,
+    _probe_macos_version,
+    _probe_windows_version,
+    _probe_memory_gb,
+    _probe_dev_entries,
+    _probe_pi_camera,
+    _probe_videocore,
+    _probe_cuda,
+)
 
 
 class PlatformDetector:
@@ -179,31 +517,7 @@ class PlatformDetector:
 
     def _is_raspberry_pi(self) -> bool:
         """Check if running on a Raspberry Pi."""
-        # Check /proc/cpuinfo for Raspberry Pi
-        try:
-            with open("/proc/cpuinfo", "r") as f:
-                cpuinfo = f.read().lower()
-                if "raspberry pi" in cpuinfo or "bcm" in cpuinfo:
-                    return True
-        except (FileNotFoundError, PermissionError):
-            pass
-
-        # Check /proc/device-tree/model
-        try:
-            with open("/proc/device-tree/model", "r") as f:
-                model = f.read().lower()
-                if "raspberry pi" in model:
-                    return True
-        except (FileNotFoundError, PermissionError):
-            pass
-
-        # Check for Raspberry Pi specific files
-        rpi_indicators = ["/opt/vc/bin/vcgencmd", "/sys/firmware/devicetree/base/model"]
-        for indicator in rpi_indicators:
-            if os.path.exists(indicator):
-                return True
-
-        return False
+        return _probe_raspberry_pi()
 
     def is_raspberry_pi(self) -> bool:
         """Public method to check if running on Raspberry Pi."""
@@ -211,18 +525,7 @@ class PlatformDetector:
 
     def get_architecture(self) -> Architecture:
         """Detect CPU architecture."""
-        machine = platform.machine().lower()
-
-        if machine in ("aarch64", "arm64"):
-            return Architecture.ARM64
-        elif machine.startswith("arm"):
-            return Architecture.ARM32
-        elif machine in ("x86_64", "amd64"):
-            return Architecture.X86_64
-        elif machine in ("i386", "i686", "x86"):
-            return Architecture.X86
-        else:
-            return Architecture.UNKNOWN
+        return _probe_architecture()
 
     # -------------------------------------------------------------------------
     # User Detection
@@ -254,24 +557,14 @@ class PlatformDetector:
         gid = os.getgid()
         pw = pwd.getpwuid(uid)
 
-        # Get all groups the user belongs to
-        groups = []
+        # Get all groups the user belongs to. getgrouplist reads the group
+        # database in one lookup, so it also sees memberships added since
+        # login (e.g. after `usermod -aG video`).
+        groups = set()
         try:
-            # Get supplementary groups
-            group_ids = os.getgroups()
-            for gid_item in group_ids:
+            for gid_item in os.getgrouplist(pw.pw_name, gid):
                 try:
-                    groups.append(grp.getgrgid(gid_item).gr_name)
-                except KeyError:
-                    pass
-
-            # Also check common hardware groups
-            for group_name in ["video", "gpio", "i2c", "spi", "dialout", "plugdev"]:
-                try:
-                    gr = grp.getgrnam(group_name)
-                    if pw.pw_name in gr.gr_mem or gid == gr.gr_gid:
-                        if group_name not in groups:
-                            groups.append(group_name)
+                    groups.add(grp.getgrgid(gid_item).gr_name)
                 except KeyError:
                     pass
         except Exception as e:
@@ -282,7 +575,7 @@ class PlatformDetector:
             uid=uid,
             gid=gid,
             home_dir=pw.pw_dir,
-            groups=sorted(set(groups)),
+            groups=sorted(groups),
             is_root=(uid == 0),
         )
 
@@ -331,10 +624,10 @@ class PlatformDetector:
         # Get OS name and version
         if os_type == OSType.MACOS:
             os_name = "macOS"
-            os_version = platform.mac_ver()[0]
+            os_version = _probe_macos_version()
         elif os_type == OSType.WINDOWS:
             os_name = "Windows"
-            os_version = platform.win32_ver()[0]
+            os_version = _probe_windows_version()
         elif os_type in (OSType.LINUX, OSType.RASPBERRY_PI):
             os_name, os_version = self._get_linux_distro_info()
         else:
@@ -360,72 +653,11 @@ class PlatformDetector:
 
     def _get_linux_distro_info(self) -> tuple:
         """Get Linux distribution name and version."""
-        try:
-            with open("/etc/os-release", "r") as f:
-                lines = f.readlines()
-
-            info = {}
-            for line in lines:
-                if "=" in line:
-                    key, value = line.strip().split("=", 1)
-                    info[key] = value.strip('"')
-
-            name = info.get("PRETTY_NAME", info.get("NAME", "Linux"))
-            version = info.get("VERSION_ID", "")
-            return name, version
-        except Exception:
-            return "Linux", ""
+        return _probe_linux_distro_info()
 
     def _get_memory_gb(self) -> float:
         """Get total system memory in GB."""
-        os_type = self.get_os_type()
-
-        if os_type == OSType.WINDOWS:
-            try:
-                import ctypes
-
-                kernel32 = ctypes.windll.kernel32
-                c_ulong = ctypes.c_ulong
-
-                class MEMORYSTATUS(ctypes.Structure):
-                    _fields_ = [
-                        ("dwLength", c_ulong),
-                        ("dwMemoryLoad", c_ulong),
-                        ("dwTotalPhys", c_ulong),
-                        ("dwAvailPhys", c_ulong),
-                        ("dwTotalPageFile", c_ulong),
-                        ("dwAvailPageFile", c_ulong),
-                        ("dwTotalVirtual", c_ulong),
-                        ("dwAvailVirtual", c_ulong),
-                    ]
-
-                memory_status = MEMORYSTATUS()
-                memory_status.dwLength = ctypes.sizeof(MEMORYSTATUS)
-                kernel32.GlobalMemoryStatus(ctypes.byref(memory_status))
-                return memory_status.dwTotalPhys / (1024**3)
-            except Exception:
-                return 0.0
-        else:
-            try:
-                with open("/proc/meminfo", "r") as f:
-                    for line in f:
-                        if line.startswith("MemTotal:"):
-                            kb = int(line.split()[1])
-                            return kb / (1024**2)
-            except Exception:
-                pass
-
-            # Fallback for macOS
-            try:
-                result = subprocess.run(
-                    ["sysctl", "-n", "hw.memsize"], capture_output=True, text=True
-                )
-                if result.returncode == 0:
-                    return int(result.stdout.strip()) / (1024**3)
-            except Exception:
-                pass
-
-        return 0.0
+        return _probe_memory_gb(self.get_os_type() == OSType.WINDOWS)
 
     # -------------------------------------------------------------------------
     # Path Detection
@@ -458,89 +690,86 @@ class PlatformDetector:
         if self._hardware is not None:
             return self._hardware
 
+        # Resolve the shared OS and /dev probes up front so workers don't
+        # race on them; lru_cache doesn't stop concurrent first calls
+        self.get_os_type()
+        _probe_dev_entries()
+
+        # The probes are independent and mostly wait on subprocesses or
+        # imports, so run them side by side rather than one after another
+        probes = {
+            "pi_camera": self._detect_pi_camera,
+            "usb_camera": self._detect_usb_camera,
+            "has_gpio": self._detect_gpio,
+            "has_i2c": self._detect_i2c,
+            "has_spi": self._detect_spi,
+            "can_run_ncnn": self._can_run_ncnn,
+            "gpu_available": self._detect_gpu,
+        }
+        with ThreadPoolExecutor(
+            max_workers=HARDWARE_PROBE_WORKERS, thread_name_prefix="HardwareProbe"
+        ) as pool:
+            futures = {name: pool.submit(probe) for name, probe in probes.items()}
+            results = {name: future.result() for name, future in futures.items()}
+
+        # Each camera probe ran once; derive both camera fields from them
+        pi_camera = results.pop("pi_camera")
+        usb_camera = results.pop("usb_camera")
+        if pi_camera:
+            camera_type = "pi_camera"
+        elif usb_camera:
+            camera_type = "usb_camera"
+        else:
+            camera_type = None
+
         self._hardware = HardwareCapabilities(
-            has_camera=self._detect_camera(),
-            camera_type=self._detect_camera_type(),
-            has_gpio=self._detect_gpio(),
-            has_i2c=self._detect_i2c(),
-            has_spi=self._detect_spi(),
-            can_run_ncnn=self._can_run_ncnn(),
-            gpu_available=self._detect_gpu(),
+            has_camera=camera_type is not None,
+            camera_type=camera_type,
+            **results,
         )
 
         return self._hardware
 
-    def _detect_camera(self) -> bool:
-        """Check if any camera is available."""
-        # Check for Pi Camera
-        if self._detect_pi_camera():
-            return True
-
-        # Check for USB cameras
-        if self._detect_usb_camera():
-            return True
-
-        return False
-
-    def _detect_camera_type(self) -> Optional[str]:
-        """Detect the type of camera available."""
-        if self._detect_pi_camera():
-            return "pi_camera"
-        elif self._detect_usb_camera():
-            return "usb_camera"
-        return None
-
     def _detect_pi_camera(self) -> bool:
         """Check if Pi Camera is available."""
         if not self.is_raspberry_pi():
             return False
 
-        try:
-            # Check libcamera
-            result = subprocess.run(
-                ["libcamera-hello", "--list-cameras"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            if result.returncode == 0 and "Available cameras" in result.stdout:
-                return True
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+        return _probe_pi_camera()
 
-        # Check legacy camera interface
-        try:
-            result = subprocess.run(
-                ["vcgencmd", "get_camera"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and "detected=1" in result.stdout:
-                return True
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+    def _detect_usb_camera(self, deep_probe: bool = False) -> bool:
+        """
+        Check if USB camera is available.
 
-        return False
+        Only looks for V4L2 device nodes, so detection never loads OpenCV
+        or takes the device away from the capture pipeline. Platforms
+        without /dev/video* report no camera unless deep_probe is set.
+        """
+        if self.get_os_type() in (OSType.LINUX, OSType.RASPBERRY_PI):
+            return _has_device_node("video")
 
-    def _detect_usb_camera(self) -> bool:
-        """Check if USB camera is available."""
-        # Check /dev/video* devices
-        import glob
+        if deep_probe:
+            return self.verify_camera_openable()
 
-        video_devices = glob.glob("/dev/video*")
-        if video_devices:
-            return True
+        return False
 
-        # Try OpenCV
+    def verify_camera_openable(self, device_id: int = 0) -> bool:
+        """
+        Open and immediately release a camera through OpenCV.
+
+        Expensive (loads OpenCV and grabs the device); call it only right
+        before the camera is actually going to be used.
+        """
         try:
             import cv2
 
-            cap = cv2.VideoCapture(0)
-            if cap.isOpened():
+            cap = cv2.VideoCapture(device_id)
+            try:
+                return cap.isOpened()
+            finally:
                 cap.release()
-                return True
         except Exception:
-            pass
-
-        return False
+            return False
 
     def _detect_gpio(self) -> bool:
         """Check if GPIO is available."""
@@ -552,24 +781,15 @@ class PlatformDetector:
             return True
 
         # Check for gpiochip
-        import glob
-
-        if glob.glob("/dev/gpiochip*"):
-            return True
-
-        return False
+        return _has_device_node("gpiochip")
 
     def _detect_i2c(self) -> bool:
         """Check if I2C is available."""
-        import glob
-
-        return bool(glob.glob("/dev/i2c-*"))
+        return _has_device_node("i2c-")
 
     def _detect_spi(self) -> bool:
         """Check if SPI is available."""
-        import glob
-
-        return bool(glob.glob("/dev/spidev*"))
+        return _has_device_node("spidev")
 
     def _can_run_ncnn(self) -> bool:
         """Check if NCNN can run on this platform."""
@@ -580,28 +800,10 @@ class PlatformDetector:
         """Check if GPU acceleration is available."""
         os_type = self.get_os_type()
 
-        if os_type == OSType.RASPBERRY_PI:
-            # Check VideoCore
-            try:
-                result = subprocess.run(
-                    ["vcgencmd", "get_mem", "gpu"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                return result.returncode == 0
-            except Exception:
-                pass
-
-        # Check for CUDA
-        try:
-            import torch
-
-            return torch.cuda.is_available()
-        except ImportError:
-            pass
+        if os_type == OSType.RASPBERRY_PI and _probe_videocore():
+            return True
 
-        return False
+        return _probe_cuda()
 
     def has_camera(self) -> bool:
         """Check if camera is available."""
@@ -636,42 +838,62 @@ class PlatformDetector:
         user_info = report["user"]
         hw_info = report["hardware"]
 
-        print("=" * 60)
-        print("OPTIC-SHIELD Platform Detection Report")
-        print("=" * 60)
-        print(f"OS Type:        {sys_info['os_type']}")
-        print(f"OS Name:        {sys_info['os_name']} {sys_info['os_version']}")
-        print(f"Architecture:   {sys_info['architecture']}")
-        print(f"CPU Cores:      {sys_info['cpu_count']}")
-        print(f"Memory:         {sys_info['memory_gb']} GB")
-        print(f"Python:         {sys_info['python_version']}")
-        print("-" * 60)
-        print(f"User:           {user_info['username']}")
-        print(f"Groups:         {', '.join(user_info['groups']) or 'None detected'}")
-        print(f"Is Root:        {user_info['is_root']}")
-        print("-" * 60)
-        print(
-            f"Camera:         {'✓ ' + (hw_info['camera_type'] or '') if hw_info['has_camera'] else '✗ Not detected'}"
+        camera = (
+            "✓ " + (hw_info["camera_type"] or "")
+            if hw_info["has_camera"]
+            else "✗ Not detected"
         )
-        print(f"GPIO:           {'✓' if hw_info['has_gpio'] else '✗'}")
-        print(f"I2C:            {'✓' if hw_info['has_i2c'] else '✗'}")
-        print(f"NCNN Support:   {'✓' if hw_info['can_run_ncnn'] else '✗'}")
-        print("=" * 60)
+        lines = [
+            "=" * 60,
+            "OPTIC-SHIELD Platform Detection Report",
+            "=" * 60,
+            f"OS Type:        {sys_info['os_type']}",
+            f"OS Name:        {sys_info['os_name']} {sys_info['os_version']}",
+            f"Architecture:   {sys_info['architecture']}",
+            f"CPU Cores:      {sys_info['cpu_count']}",
+            f"Memory:         {sys_info['memory_gb']} GB",
+            f"Python:         {sys_info['python_version']}",
+            "-" * 60,
+            f"User:           {user_info['username']}",
+            f"Groups:         {', '.join(user_info['groups']) or 'None detected'}",
+            f"Is Root:        {user_info['is_root']}",
+            "-" * 60,
+            f"Camera:         {camera}",
+            f"GPIO:           {'✓' if hw_info['has_gpio'] else '✗'}",
+            f"I2C:            {'✓' if hw_info['has_i2c'] else '✗'}",
+            f"NCNN Support:   {'✓' if hw_info['can_run_ncnn'] else '✗'}",
+            "=" * 60,
+        ]
 
         missing = report["missing_groups"]
         if missing:
-            print(f"\n⚠️  Missing groups: {', '.join(missing)}")
-            print(
+            lines.append(f"\n⚠️  Missing groups: {', '.join(missing)}")
+            lines.append(
                 "   Run: sudo usermod -aG "
                 + ",".join(missing)
                 + f" {user_info['username']}"
             )
 
+        # One write instead of a locked, possibly flushed write per line
+        sys.stdout.write("\n".join(lines) + "\n")
+
 
 # Singleton instance
 _detector: Optional[PlatformDetector] = None
 
 
+def _clear_caches():
+    """Drop all cached detection results."""
+    global _detector
+    for probe in _PROBES:
+        probe.cache_clear()
+    _detector = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_caches)
+
+
 def get_detector(base_path: Optional[Path] = None) -> PlatformDetector:
     """Get or create the platform detector singleton."""
     global _detector
@@ -10,7 +10,7 @@ import platform
 import subprocess
 import time
 import threading
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -20,11 +20,83 @@ IS_LINUX = platform.system() == "Linux"
 IS_MACOS = platform.system() == "Darwin"
 IS_WINDOWS = platform.system() == "Windows"
 
+# Linux sources read once per tick, with the most bytes each parser needs:
+# the aggregate cpu line, the first meminfo lines, the millidegree value
+_LINUX_SOURCES = (
+    ("/proc/stat", 512),
+    ("/proc/meminfo", 256),
+    ("/sys/class/thermal/thermal_zone0/temp", 16),
+)
+
+# Disk usage moves slowly: statvfs every Nth tick, every tick once usage
+# is above the watch level so the 90% alert isn't delayed
+DISK_SAMPLE_TICKS = 10
+DISK_WATCH_PERCENT = 80
+
+# Fixed alert limits; memory and CPU limits come from configuration
+TEMPERATURE_LIMIT_CELSIUS = 80
+DISK_LIMIT_PERCENT = 90
+
+# Stats are kept at full precision; rounding is only for reporting
+_DISPLAY_DIGITS = {
+    "cpu_percent": 1,
+    "memory_percent": 1,
+    "memory_used_mb": 1,
+    "memory_available_mb": 1,
+    "temperature_celsius": 1,
+    "disk_percent": 1,
+    "disk_used_gb": 2,
+    "disk_free_gb": 2,
+}
+
+_EMPTY_MEMORY = {"total_mb": 0, "used_mb": 0, "available_mb": 0, "percent": 0}
+
+
+def _meminfo_kb(meminfo: bytes, key: bytes) -> int:
+    """Return the kB value of one /proc/meminfo key, or 0 if absent."""
+    start = meminfo.find(key)
+    if start < 0:
+        return 0
+    start += len(key)
+    end = meminfo.find(b"\n", start)
+    return int(meminfo[start:end if end >= 0 else None].split()[0])
+
+
+def _parse_cpu_line(stat: bytes) -> Tuple[int, int]:
+    """Return (idle, total) jiffies from the aggregate cpu line of /proc/stat."""
+    end = stat.find(b"\n")
+    # int() parses the bytes fields directly; no per-field str decode
+    values = list(map(int, stat[4:end if end >= 0 else None].split()))
+    return values[3], sum(values)
+
+
+def _guarded(callback: Callable[[str, Any], None]) -> Callable[[str, Any], None]:
+    """Wrap an alert callback so its errors are logged, not raised."""
+    def call(alert_type: str, message: str):
+        try:
+            callback(alert_type, message)
+        except Exception as e:
+            logger.error("Alert callback error: %s", e)
+    return call
+
 
 @dataclass
 class SystemStats:
     """System resource statistics."""
 
+    # Explicit slots rather than dataclass(slots=True), which needs 3.10+
+    __slots__ = (
+        "cpu_percent",
+        "memory_percent",
+        "memory_used_mb",
+        "memory_available_mb",
+        "temperature_celsius",
+        "disk_percent",
+        "disk_used_gb",
+        "disk_free_gb",
+        "uptime_seconds",
+    )
+
     cpu_percent: float
     memory_percent: float
     memory_used_mb: float
@@ -42,6 +114,11 @@ class SystemMonitor:
     Provides alerts when resources are constrained.
     """
 
+    _MEMORY_MSG = "Memory usage {value:.0f}MB exceeds limit {limit}MB"
+    _CPU_MSG = "CPU usage {value:.1f}% exceeds limit {limit}%"
+    _TEMPERATURE_MSG = "Temperature {value:.1f}°C is critically high"
+    _DISK_MSG = "Disk usage {value:.1f}% is critically high"
+
     def __init__(
         self,
         max_memory_mb: int = 512,
@@ -54,29 +131,72 @@ class SystemMonitor:
 
         self._stop_event = threading.Event()
         self._monitor_thread: Optional[threading.Thread] = None
+        # The singleton is shared: each start() is matched by one stop(),
+        # and only the last stop() ends the thread and closes the fds
+        self._users = 0
+        self._lifecycle_lock = threading.Lock()
         self._last_stats: Optional[SystemStats] = None
-        self._alert_callbacks: list = []
+        self._alert_callbacks: Tuple[Callable[[str, Any], None], ...] = ()
         self._start_time = time.time()
+        # (alert type, SystemStats field, limit, message), checked in one loop.
+        # Limits are baked into the messages here; only the measured value
+        # is formatted, and only when an alert actually fires.
+        self._thresholds = tuple(
+            (alert_type, field, limit, template.replace("{limit}", str(limit)))
+            for alert_type, field, limit, template in (
+                ("memory_high", "memory_used_mb", max_memory_mb, self._MEMORY_MSG),
+                ("cpu_high", "cpu_percent", max_cpu_percent, self._CPU_MSG),
+                ("temperature_high", "temperature_celsius",
+                 TEMPERATURE_LIMIT_CELSIUS, self._TEMPERATURE_MSG),
+                ("disk_high", "disk_percent", DISK_LIMIT_PERCENT, self._DISK_MSG),
+            )
+        )
+        # Installed memory doesn't change while running; parsed once
+        self._mem_total_kb: Optional[int] = None
+        self._disk: Optional[Dict[str, float]] = None
+        self._disk_tick = 0
+        # Kept open across ticks and read with pread at offset 0
+        self._source_fds: List[Optional[int]] = [None] * len(_LINUX_SOURCES)
+        # (idle, total) jiffies from the previous /proc/stat read
+        self._last_cpu: Optional[Tuple[int, int]] = None
+        # get_stats runs on the monitor thread and on callers' threads; the
+        # fds, CPU baseline and disk cache above are only touched under this
+        self._sample_lock = threading.Lock()
+        if IS_LINUX:
+            # Seed the CPU baseline now so the first tick reports real usage
+            self._get_cpu_percent_linux(self._read_linux_sources()[0])
 
     def start(self):
-        """Start background monitoring."""
-        self._stop_event.clear()
-        self._monitor_thread = threading.Thread(
-            target=self._monitor_loop, name="SystemMonitor", daemon=True
-        )
-        self._monitor_thread.start()
+        """Start background monitoring, or join monitoring already running."""
+        with self._lifecycle_lock:
+            self._users += 1
+            if self._monitor_thread and self._monitor_thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._monitor_thread = threading.Thread(
+                target=self._monitor_loop, name="SystemMonitor", daemon=True
+            )
+            self._monitor_thread.start()
         logger.info("System monitor started")
 
     def stop(self):
-        """Stop background monitoring."""
-        self._stop_event.set()
-        if self._monitor_thread and self._monitor_thread.is_alive():
-            self._monitor_thread.join(timeout=5)
+        """Release one start(); monitoring stops when the last user stops."""
+        with self._lifecycle_lock:
+            if self._users > 1:
+                self._users -= 1
+                return
+            self._users = 0
+            self._stop_event.set()
+            if self._monitor_thread and self._monitor_thread.is_alive():
+                self._monitor_thread.join(timeout=5)
+            with self._sample_lock:
+                self._close_sources()
         logger.info("System monitor stopped")
 
     def add_alert_callback(self, callback: Callable[[str, Any], None]):
         """Add callback for resource alerts."""
-        self._alert_callbacks.append(callback)
+        # Swapped as a whole, so an alert in flight iterates a stable tuple
+        self._alert_callbacks = self._alert_callbacks + (_guarded(callback),)
 
     def _monitor_loop(self):
         """Background monitoring loop."""
@@ -86,62 +206,88 @@ class SystemMonitor:
                 self._last_stats = stats
                 self._check_thresholds(stats)
             except Exception as e:
-                logger.error(f"Monitor error: {e}")
+                logger.error("Monitor error: %s", e)
 
             self._stop_event.wait(self.check_interval)
 
     def get_stats(self) -> SystemStats:
         """Get current system statistics."""
-        cpu_percent = self._get_cpu_percent()
-        memory = self._get_memory_info()
-        temperature = self._get_temperature()
-        disk = self._get_disk_info()
+        with self._sample_lock:
+            if IS_LINUX:
+                stat, meminfo, temp = self._read_linux_sources()
+                cpu_percent = self._get_cpu_percent_linux(stat)
+                memory = self._get_memory_info_linux(meminfo)
+                temperature = self._get_temperature_linux(temp)
+            elif IS_MACOS:
+                cpu_percent = self._get_cpu_percent_macos()
+                memory = self._get_memory_info_macos()
+                # macOS doesn't expose CPU temp easily without third-party tools
+                temperature = None
+            else:
+                cpu_percent = 0.0
+                memory = _EMPTY_MEMORY
+                temperature = None
+            disk = self._sample_disk_info()
         uptime = time.time() - self._start_time
 
         return SystemStats(
-            cpu_percent=cpu_percent,
-            memory_percent=memory.get("percent", 0),
-            memory_used_mb=memory.get("used_mb", 0),
-            memory_available_mb=memory.get("available_mb", 0),
-            temperature_celsius=temperature,
-            disk_percent=disk.get("percent", 0),
-            disk_used_gb=disk.get("used_gb", 0),
-            disk_free_gb=disk.get("free_gb", 0),
-            uptime_seconds=uptime,
+            cpu_percent,
+            memory.get("percent", 0),
+            memory.get("used_mb", 0),
+            memory.get("available_mb", 0),
+            temperature,
+            disk.get("percent", 0),
+            disk.get("used_gb", 0),
+            disk.get("free_gb", 0),
+            uptime,
         )
 
-    def _get_cpu_percent(self) -> float:
-        """Get CPU usage percentage."""
-        if IS_LINUX:
-            return self._get_cpu_percent_linux()
-        elif IS_MACOS:
-            return self._get_cpu_percent_macos()
-        else:
-            return 0.0
-
-    def _get_cpu_percent_linux(self) -> float:
-        """Get CPU usage on Linux via /proc/stat."""
+    def _read_linux_sources(self) -> Tuple[Optional[bytes], ...]:
+        """Read every procfs/sysfs source for one tick in a single pass."""
+        data = []
+        for i, (path, size) in enumerate(_LINUX_SOURCES):
+            fd = self._source_fds[i]
+            try:
+                if fd is None:
+                    fd = self._source_fds[i] = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+                # procfs/sysfs regenerate the content on each read from offset 0
+                data.append(os.pread(fd, size, 0))
+            except OSError:
+                if fd is not None:
+                    os.close(fd)
+                    self._source_fds[i] = None
+                data.append(None)
+        return tuple(data)
+
+    def _close_sources(self):
+        """Close the persistent source file descriptors."""
+        for i, fd in enumerate(self._source_fds):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                self._source_fds[i] = None
+
+    def _get_cpu_percent_linux(self, stat: Optional[bytes]) -> float:
+        """Get CPU usage on Linux from the head of /proc/stat."""
         try:
-            with open("/proc/stat", "r") as f:
-                line = f.readline()
-                fields = line.split()
-                idle = int(fields[4])
-                total = sum(int(x) for x in fields[1:])
+            idle, total = _parse_cpu_line(stat)
 
-                if not hasattr(self, "_last_cpu"):
-                    self._last_cpu = (idle, total)
-                    return 0.0
+            if self._last_cpu is None:
+                self._last_cpu = (idle, total)
+                return 0.0
 
-                last_idle, last_total = self._last_cpu
-                idle_delta = idle - last_idle
-                total_delta = total - last_total
+            last_idle, last_total = self._last_cpu
+            idle_delta = idle - last_idle
+            total_delta = total - last_total
 
-                self._last_cpu = (idle, total)
+            self._last_cpu = (idle, total)
 
-                if total_delta == 0:
-                    return 0.0
+            if total_delta == 0:
+                return 0.0
 
-                return round((1 - idle_delta / total_delta) * 100, 1)
+            return (1 - idle_delta / total_delta) * 100
         except Exception:
             return 0.0
 
@@ -158,46 +304,29 @@ class SystemMonitor:
                     for part in parts:
                         if "idle" in part:
                             idle = float(part.split("%")[0].strip().split()[-1])
-                            return round(100 - idle, 1)
+                            return 100 - idle
         except Exception:
             pass
         return 0.0
 
-    def _get_memory_info(self) -> Dict[str, float]:
-        """Get memory usage information."""
-        if IS_LINUX:
-            return self._get_memory_info_linux()
-        elif IS_MACOS:
-            return self._get_memory_info_macos()
-        else:
-            return {"total_mb": 0, "used_mb": 0, "available_mb": 0, "percent": 0}
-
-    def _get_memory_info_linux(self) -> Dict[str, float]:
-        """Get memory info on Linux via /proc/meminfo."""
+    def _get_memory_info_linux(self, meminfo: Optional[bytes]) -> Dict[str, float]:
+        """Get memory info on Linux from the head of /proc/meminfo."""
         try:
-            with open("/proc/meminfo", "r") as f:
-                lines = f.readlines()
-
-            mem_info = {}
-            for line in lines:
-                parts = line.split()
-                key = parts[0].rstrip(":")
-                value = int(parts[1])
-                mem_info[key] = value
-
-            total = mem_info.get("MemTotal", 0) / 1024
-            available = mem_info.get("MemAvailable", 0) / 1024
+            if not self._mem_total_kb:
+                self._mem_total_kb = _meminfo_kb(meminfo, b"MemTotal:")
+            total = self._mem_total_kb / 1024
+            available = _meminfo_kb(meminfo, b"MemAvailable:") / 1024
             used = total - available
             percent = (used / total * 100) if total > 0 else 0
 
             return {
-                "total_mb": round(total, 1),
-                "used_mb": round(used, 1),
-                "available_mb": round(available, 1),
-                "percent": round(percent, 1),
+                "total_mb": total,
+                "used_mb": used,
+                "available_mb": available,
+                "percent": percent,
             }
         except Exception:
-            return {"total_mb": 0, "used_mb": 0, "available_mb": 0, "percent": 0}
+            return _EMPTY_MEMORY
 
     def _get_memory_info_macos(self) -> Dict[str, float]:
         """Get memory info on macOS via vm_stat."""
@@ -230,33 +359,35 @@ class SystemMonitor:
             percent = (used_mb / total_mb * 100) if total_mb > 0 else 0
 
             return {
-                "total_mb": round(total_mb, 1),
-                "used_mb": round(used_mb, 1),
-                "available_mb": round(available_mb, 1),
-                "percent": round(percent, 1),
+                "total_mb": total_mb,
+                "used_mb": used_mb,
+                "available_mb": available_mb,
+                "percent": percent,
             }
         except Exception:
             return {"total_mb": 0, "used_mb": 0, "available_mb": 0, "percent": 0}
 
-    def _get_temperature(self) -> Optional[float]:
-        """Get CPU temperature (Raspberry Pi/Linux specific)."""
-        if IS_LINUX:
-            try:
-                with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                    temp = int(f.read().strip()) / 1000.0
-                    return round(temp, 1)
-            except Exception:
-                pass
-        elif IS_MACOS:
-            # macOS doesn't expose CPU temp easily without third-party tools
-            pass
-        return None
+    def _get_temperature_linux(self, temp: Optional[bytes]) -> Optional[float]:
+        """Get CPU temperature from the thermal zone (Raspberry Pi/Linux)."""
+        try:
+            return int(temp) / 1000.0
+        except Exception:
+            return None
+
+    def _sample_disk_info(self) -> Dict[str, float]:
+        """Get disk usage, reusing the last reading between samples."""
+        if (
+            self._disk is None
+            or self._disk_tick % DISK_SAMPLE_TICKS == 0
+            or self._disk.get("percent", 0) > DISK_WATCH_PERCENT
+        ):
+            self._disk = self._get_disk_info()
+        self._disk_tick += 1
+        return self._disk
 
     def _get_disk_info(self) -> Dict[str, float]:
         """Get disk usage information."""
         try:
-            import os
-
             stat = os.statvfs("/")
 
             total = stat.f_blocks * stat.f_frsize / (1024**3)
@@ -265,60 +396,69 @@ class SystemMonitor:
             percent = (used / total * 100) if total > 0 else 0
 
             return {
-                "total_gb": round(total, 2),
-                "used_gb": round(used, 2),
-                "free_gb": round(free, 2),
-                "percent": round(percent, 1),
+                "total_gb": total,
+                "used_gb": used,
+                "free_gb": free,
+                "percent": percent,
             }
         except Exception:
             return {"total_gb": 0, "used_gb": 0, "free_gb": 0, "percent": 0}
 
     def _check_thresholds(self, stats: SystemStats):
         """Check resource thresholds and trigger alerts."""
-        if stats.memory_used_mb > self.max_memory_mb:
-            self._trigger_alert(
-                "memory_high",
-                f"Memory usage {stats.memory_used_mb:.0f}MB exceeds limit {self.max_memory_mb}MB",
-            )
-
-        if stats.cpu_percent > self.max_cpu_percent:
-            self._trigger_alert(
-                "cpu_high",
-                f"CPU usage {stats.cpu_percent:.1f}% exceeds limit {self.max_cpu_percent}%",
-            )
-
-        if stats.temperature_celsius and stats.temperature_celsius > 80:
-            self._trigger_alert(
-                "temperature_high",
-                f"Temperature {stats.temperature_celsius:.1f}°C is critically high",
-            )
-
-        if stats.disk_percent > 90:
-            self._trigger_alert(
-                "disk_high", f"Disk usage {stats.disk_percent:.1f}% is critically high"
-            )
+        for alert_type, field, limit, message in self._thresholds:
+            value = getattr(stats, field)
+            # Temperature is None where no thermal zone exists
+            if value is not None and value > limit:
+                self._trigger_alert(alert_type, message.format(value=value))
 
     def _trigger_alert(self, alert_type: str, message: str):
         """Trigger resource alert."""
-        logger.warning(f"System alert [{alert_type}]: {message}")
+        logger.warning("System alert [%s]: %s", alert_type, message)
 
         for callback in self._alert_callbacks:
-            try:
-                callback(alert_type, message)
-            except Exception as e:
-                logger.error(f"Alert callback error: {e}")
+            callback(alert_type, message)
 
     def get_stats_dict(self) -> Dict[str, Any]:
         """Get stats as dictionary."""
         stats = self._last_stats or self.get_stats()
-        return {
-            "cpu_percent": stats.cpu_percent,
-            "memory_percent": stats.memory_percent,
-            "memory_used_mb": stats.memory_used_mb,
-            "memory_available_mb": stats.memory_available_mb,
-            "temperature_celsius": stats.temperature_celsius,
-            "disk_percent": stats.disk_percent,
-            "disk_used_gb": stats.disk_used_gb,
-            "disk_free_gb": stats.disk_free_gb,
-            "uptime_seconds": stats.uptime_seconds,
-        }
+        result = {}
+        for name in SystemStats.__slots__:
+            value = getattr(stats, name)
+            digits = _DISPLAY_DIGITS.get(name)
+            result[name] = round(value, digits) if digits is not None and value is not None else value
+        return result
+
+
+# Singleton instance
+_monitor: Optional[SystemMonitor] = None
+
+
+def get_system_monitor(
+    max_memory_mb: int = 512,
+    max_cpu_percent: int = 80,
+    check_interval: int = 30,
+) -> SystemMonitor:
+    """
+    Get or create the system monitor singleton.
+
+    Settings only apply when the monitor is first created, so every
+    subsystem shares one thread and one set of open /proc descriptors.
+    Callers that start() it must stop() it once; see SystemMonitor.stop.
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = SystemMonitor(max_memory_mb, max_cpu_percent, check_interval)
+    elif (
+        max_memory_mb != _monitor.max_memory_mb
+        or max_cpu_percent != _monitor.max_cpu_percent
+        or check_interval != _monitor.check_interval
+    ):
+        logger.warning(
+            "System monitor already created with max_memory_mb=%s, "
+            "max_cpu_percent=%s, check_interval=%s; ignoring %s/%s/%s",
+            _monitor.max_memory_mb, _monitor.max_cpu_percent,
+            _monitor.check_interval,
+            max_memory_mb, max_cpu_percent, check_interval,
+        )
+    return _monitor
@@ -0,0 +1,7 @@
+"""Shared pytest setup for the device tests."""
+
+import sys
+from pathlib import Path
+
+# Tests import the service as "src.*", the same way main.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,26 @@
+"""Tests for the simulated camera frame generator."""
+
+import numpy as np
+import pytest
+
+from src.core.camera import CameraManager
+
+
+@pytest.mark.parametrize("width, height", [(640, 480), (5, 3)])
+def test_simulated_frame_shape_and_range(width, height):
+    camera = CameraManager(width=width, height=height)
+    
+    frame = camera._generate_simulated_frame()
+    
+    assert frame.shape == (height, width, 3) and frame.dtype == np.uint8
+    assert frame.flags.writeable and frame.flags.c_contiguous
+    assert frame[:, :, 0].max() <= 63 and frame[:, :, 2].max() <= 63
+    assert 20 <= frame[:, :, 1].min() and frame[:, :, 1].max() <= 83
+
+
+def test_simulated_frames_differ():
+    camera = CameraManager(width=64, height=48)
+    
+    assert not np.array_equal(
+        camera._generate_simulated_frame(), camera._generate_simulated_frame()
+    )
@@ -0,0 +1,166 @@
+"""Tests for the SQLite detection store."""
+
+import sqlite3
+import time
+
+import pytest
+
+from src.storage.database import DetectionDatabase, DetectionRecord, _pack_bbox
+
+
+def _record(i: int, bbox=(10, 20, 110, 220)) -> DetectionRecord:
+    x1, y1, x2, y2 = bbox
+    return DetectionRecord(
+        id=None,
+        device_id="test-device",
+        timestamp=time.time(),
+        class_id=15 + i % 3,
+        class_name=f"class-{i}",
+        confidence=0.5 + i / 100,
+        bbox_x1=x1,
+        bbox_y1=y1,
+        bbox_x2=x2,
+        bbox_y2=y2,
+        image_path=None,
+        synced=False,
+        created_at=time.time(),
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = DetectionDatabase(str(tmp_path / "detections.db"))
+    assert database.initialize()
+    yield database
+    database.close_all()
+
+
+def test_insert_detections_returns_assigned_ids(db):
+    first = db.insert_detection(_record(0))
+    ids = db.insert_detections([_record(i) for i in range(1, 6)])
+    
+    assert ids == list(range(first + 1, first + 6))
+    stored = {r.id: r.class_name for r in db.get_unsynced_detections()}
+    assert stored == {first + i: f"class-{i}" for i in range(6)}
+
+
+def test_insert_detections_empty_batch(db):
+    assert db.insert_detections([]) == []
+
+
+def test_failed_batch_is_rolled_back(db):
+    bad = _record(1)
+    bad.class_name = None
+    
+    assert db.insert_detections([_record(0), bad]) == []
+    assert db.get_unsynced_detections() == []
+    # The connection is usable again after the rollback
+    assert len(db.insert_detections([_record(2)])) == 1
+
+
+def test_pack_bbox_clamps_to_uint16():
+    assert _pack_bbox(-5, 0, 70000, 65535) == _pack_bbox(0, 0, 65535, 65535)
+
+
+def test_bbox_round_trip(db):
+    [record_id] = db.insert_detections([_record(0, bbox=(0, 7, 1919, 1079))])
+    
+    [stored] = db.get_unsynced_detections()
+    assert stored.id == record_id
+    assert (stored.bbox_x1, stored.bbox_y1, stored.bbox_x2, stored.bbox_y2) == (0, 7, 1919, 1079)
+
+
+def _create_legacy_db(path, rows):
+    """Create a database with the pre-BLOB schema: one column per bbox edge."""
+    conn = sqlite3.connect(str(path))
+    conn.execute("""
+        CREATE TABLE detections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            device_id TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            class_id INTEGER NOT NULL,
+            class_name TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            bbox_x1 INTEGER NOT NULL,
+            bbox_y1 INTEGER NOT NULL,
+            bbox_x2 INTEGER NOT NULL,
+            bbox_y2 INTEGER NOT NULL,
+            image_path TEXT,
+            synced INTEGER DEFAULT 0,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def _columns(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return {row[1] for row in conn.execute("PRAGMA table_info(detections)")}
+    finally:
+        conn.close()
+
+
+def test_migrates_separate_bbox_columns(tmp_path):
+    path = tmp_path / "legacy.db"
+    now = time.time()
+    _create_legacy_db(path, [
+        (3, "legacy", now, 15, "cat", 0.9, 1, 2, 300, 400, "images/a.jpg", 0, now),
+        (8, "legacy", now, 21, "bear", 0.8, -4, 5, 70000, 600, None, 0, now),
+    ])
+    
+    database = DetectionDatabase(str(path))
+    try:
+        assert database.initialize()
+        records = {r.id: r for r in database.get_unsynced_detections()}
+        
+        assert set(records) == {3, 8}
+        cat, bear = records[3], records[8]
+        assert (cat.bbox_x1, cat.bbox_y1, cat.bbox_x2, cat.bbox_y2) == (1, 2, 300, 400)
+        assert cat.image_path == "images/a.jpg"
+        # Out-of-range legacy values are clamped into the packed format
+        assert (bear.bbox_x1, bear.bbox_y1, bear.bbox_x2, bear.bbox_y2) == (0, 5, 65535, 600)
+        
+        # AUTOINCREMENT continues after the migrated ids
+        [new_id] = database.insert_detections([_record(0)])
+        assert new_id == 9
+    finally:
+        database.close_all()
+    
+    columns = _columns(path)
+    assert "bbox" in columns and "bbox_x1" not in columns
+
+
+def test_migration_keeps_sync_state_and_runs_once(tmp_path):
+    path = tmp_path / "legacy.db"
+    now = time.time()
+    _create_legacy_db(path, [
+        (1, "legacy", now, 15, "cat", 0.9, 1, 2, 3, 4, None, 1, now),
+        (2, "legacy", now, 15, "cat", 0.9, 5, 6, 7, 8, None, 0, now),
+    ])
+    
+    for _ in range(2):
+        database = DetectionDatabase(str(path))
+        try:
+            assert database.initialize()
+            # Only the unsynced row is pending; its bbox survived both opens
+            [pending] = database.get_unsynced_detections()
+            assert pending.id == 2
+            assert (pending.bbox_x1, pending.bbox_y1, pending.bbox_x2, pending.bbox_y2) == (5, 6, 7, 8)
+            assert database.get_detection_count() == 2
+        finally:
+            database.close_all()
+    
+    conn = sqlite3.connect(str(path))
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        # The FK from sync_queue still resolves to the renamed table
+        [fk] = conn.execute("PRAGMA foreign_key_list(sync_queue)").fetchall()
+    finally:
+        conn.close()
+    assert "detections_new" not in tables
+    assert fk[2] == "detections"
@@ -0,0 +1,106 @@
+"""Tests for the detection service's background writers."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.core.camera import CameraFrame, CameraType
+from src.core.config import Config
+from src.core.detector import Detection
+from src.services.detection_service import DetectionEvent, DetectionService, ServiceState
+from src.storage.database import DetectionDatabase
+
+
+class _SlowImageStore:
+    """Image store double that writes slowly and fails for chosen classes."""
+    
+    def __init__(self, failing_class: str = ""):
+        self.failing_class = failing_class
+        self.saved = []
+    
+    def build_image_path(self, detection_id: int, class_name: str) -> str:
+        return f"images/{detection_id}_{class_name}.jpg"
+    
+    def save_detection_image(self, image, detection_id, class_name,
+                             draw_bbox=None, relative_path=None):
+        time.sleep(0.01)
+        if class_name == self.failing_class:
+            return None
+        self.saved.append(relative_path)
+        return relative_path
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Don't replace pytest's own SIGINT handler
+    monkeypatch.setattr(DetectionService, "_setup_signal_handlers", lambda self: None)
+    svc = DetectionService(Config(config_dir=tmp_path / "config"))
+    svc.database = DetectionDatabase(str(tmp_path / "detections.db"))
+    assert svc.database.initialize()
+    yield svc
+    svc.database.close_all()
+
+
+def _start_writers(svc: DetectionService):
+    """Start only the writer threads, as start() does, without camera or model."""
+    svc._stop_event.clear()
+    svc._images_drained.clear()
+    svc._image_writer_thread = threading.Thread(target=svc._image_writer_loop, daemon=True)
+    svc._db_writer_thread = threading.Thread(target=svc._db_writer_loop, daemon=True)
+    svc._image_writer_thread.start()
+    svc._db_writer_thread.start()
+    svc.state = ServiceState.RUNNING
+
+
+def _event(class_names):
+    now = time.time()
+    frame = CameraFrame(np.zeros((4, 4, 3), dtype=np.uint8), now, 4, 4, CameraType.SIMULATED)
+    detections = [
+        Detection(15, name, 0.9, (1, 2, 3, 4), now) for name in class_names
+    ]
+    return DetectionEvent(frame, detections, 1.0, now)
+
+
+def test_stop_drains_image_and_db_queues(service):
+    store = _SlowImageStore()
+    service.image_store = store
+    _start_writers(service)
+    
+    names = [f"cat{i}" for i in range(20)]
+    service._handle_detection_event(_event(names))
+    service.stop()
+    
+    assert service.state == ServiceState.STOPPED
+    assert not service._image_writer_thread.is_alive()
+    assert not service._db_writer_thread.is_alive()
+    assert len(store.saved) == len(names)
+    records = service.database.get_unsynced_detections(limit=100)
+    assert sorted(r.class_name for r in records) == sorted(names)
+    assert all(r.image_path for r in records)
+
+
+def test_failed_image_write_leaves_no_image_path(service):
+    service.image_store = _SlowImageStore(failing_class="bear")
+    _start_writers(service)
+    
+    service._handle_detection_event(_event(["cat", "bear"]))
+    service.stop()
+    
+    paths = {r.class_name: r.image_path for r in service.database.get_unsynced_detections()}
+    assert paths["cat"] == "images/0_cat.jpg"
+    assert paths["bear"] is None
+
+
+def test_records_without_images_skip_the_image_writer(service):
+    service.config.storage.images.save_detections = False
+    service.image_store = _SlowImageStore()
+    _start_writers(service)
+    
+    service._handle_detection_event(_event(["cat"]))
+    service.stop()
+    
+    [record] = service.database.get_unsynced_detections()
+    assert record.class_name == "cat" and record.image_path is None
+    assert service.image_store.saved == []
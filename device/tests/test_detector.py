@@ -0,0 +1,210 @@
+"""Tests for model preparation and box handling in the wildlife detector."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.core import detector as detector_module
+from src.core.detector import WildlifeDetector
+
+
+class _FakeYOLO:
+    """Records export calls; fails or writes an NCNN directory on demand."""
+    
+    calls = []
+    fail = True
+    
+    def __init__(self, weights: str):
+        self.weights = Path(weights)
+    
+    def export(self, **kwargs):
+        _FakeYOLO.calls.append(kwargs)
+        if _FakeYOLO.fail:
+            raise RuntimeError("export not supported")
+        out = self.weights.with_name(f"{self.weights.stem}_ncnn_model")
+        out.mkdir()
+        (out / "model.ncnn.param").write_text("")
+        return str(out)
+
+
+@pytest.fixture
+def fake_yolo():
+    _FakeYOLO.calls = []
+    _FakeYOLO.fail = True
+    return _FakeYOLO
+
+
+@pytest.fixture
+def weights(tmp_path):
+    pt = tmp_path / "yolo11n.pt"
+    pt.write_bytes(b"weights")
+    return pt
+
+
+def _touch_later(path: Path, seconds: float = 10):
+    """Move a file's mtime forward so it is strictly newer."""
+    mtime = path.stat().st_mtime + seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_failed_export_falls_back_and_is_not_retried(weights, fake_yolo):
+    det = WildlifeDetector(model_path=str(weights))
+    marker = weights.with_name("yolo11n_ncnn_export.failed")
+    
+    assert det._prepare_ncnn_model(fake_yolo) is None
+    assert len(fake_yolo.calls) == 1
+    assert marker.exists()
+    
+    # Next boot: same weights, so the export is skipped
+    assert det._prepare_ncnn_model(fake_yolo) is None
+    assert len(fake_yolo.calls) == 1
+    
+    # New weights get another attempt, which clears the marker
+    _touch_later(weights)
+    fake_yolo.fail = False
+    ncnn_dir = det._prepare_ncnn_model(fake_yolo)
+    assert ncnn_dir == weights.with_name("yolo11n_ncnn_model")
+    assert len(fake_yolo.calls) == 2
+    assert not marker.exists()
+
+
+def test_failed_export_falls_back_to_configured_ncnn_dir(tmp_path, weights, fake_yolo):
+    ncnn_dir = tmp_path / "shipped_ncnn_model"
+    ncnn_dir.mkdir()
+    (ncnn_dir / "model.ncnn.param").write_text("")
+    det = WildlifeDetector(model_path=str(ncnn_dir), fallback_path=str(weights))
+    
+    assert det._prepare_ncnn_model(fake_yolo) == ncnn_dir
+
+
+def test_cached_export_is_reused(weights, fake_yolo):
+    fake_yolo.fail = False
+    det = WildlifeDetector(model_path=str(weights))
+    ncnn_dir = det._prepare_ncnn_model(fake_yolo)
+    _touch_later(ncnn_dir)
+    
+    assert det._prepare_ncnn_model(fake_yolo) == ncnn_dir
+    assert len(fake_yolo.calls) == 1
+
+
+@pytest.mark.parametrize("supported, expected", [
+    (None, {"format": "ncnn"}),
+    (set(), {"format": "ncnn"}),
+    ({"int8", "data"}, {"format": "ncnn", "int8": True, "data": "calib.yaml"}),
+])
+def test_int8_only_requested_when_exporter_supports_it(
+    monkeypatch, weights, fake_yolo, supported, expected
+):
+    monkeypatch.setattr(detector_module, "_ncnn_export_args", lambda: supported)
+    det = WildlifeDetector(
+        model_path=str(weights), int8=True, calibration_data="calib.yaml"
+    )
+    
+    det._prepare_ncnn_model(fake_yolo)
+    assert fake_yolo.calls == [expected]
+
+
+def test_int8_off_by_default(weights, fake_yolo):
+    det = WildlifeDetector(model_path=str(weights))
+    
+    det._prepare_ncnn_model(fake_yolo)
+    assert fake_yolo.calls == [{"format": "ncnn"}]
+
+
+class _FakeBoxes:
+    """Stands in for ultralytics Boxes: data is an (N, 6) xyxy/conf/cls array."""
+    
+    def __init__(self, rows):
+        self.data = self
+        self._rows = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def cpu(self):
+        return self
+    
+    def numpy(self):
+        return self._rows
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.boxes = _FakeBoxes(rows)
+
+
+class _FakeModel:
+    names = {0: "person"}
+
+
+def _collect(det, rows, transform, frame_shape):
+    detections = []
+    det._collect_detections(
+        _FakeModel(), _FakeResult(rows), detections, transform, frame_shape, 123.0
+    )
+    return detections
+
+
+def test_boxes_are_mapped_back_from_letterbox_space(weights):
+    det = WildlifeDetector(model_path=str(weights), confidence_threshold=0.5)
+    # A 1280x720 frame letterboxed to 640: scale 0.5, 140 px bars top and bottom
+    transform = (0.5, 0, 140)
+    
+    [tiger] = _collect(det, [[100, 190, 300, 390, 0.9, 15]], transform, (720, 1280, 3))
+    assert tiger.bbox == (200, 100, 600, 500)
+    assert tiger.class_name == "tiger"
+    assert tiger.timestamp == 123.0
+
+
+def test_mapped_boxes_are_clipped_to_the_frame(weights):
+    det = WildlifeDetector(model_path=str(weights))
+    
+    # Box reaching into the padding on every side
+    [box] = _collect(det, [[-10, 100, 650, 560, 0.9, 16]], (0.5, 0, 140), (720, 1280, 3))
+    assert box.bbox == (0, 0, 1280, 720)
+
+
+def test_non_target_and_low_confidence_boxes_are_dropped(weights):
+    det = WildlifeDetector(model_path=str(weights), confidence_threshold=0.5)
+    rows = [
+        [0, 0, 10, 10, 0.9, 0],    # person: not a target class
+        [0, 0, 10, 10, 0.4, 15],   # below the threshold
+        [0, 0, 10, 10, 0.6, 18],
+    ]
+    
+    [lion] = _collect(det, rows, (1.0, 0, 0), (480, 640, 3))
+    assert (lion.class_name, lion.bbox) == ("lion", (0, 0, 10, 10))
+
+
+def test_fallback_letterbox_pads_and_normalizes(monkeypatch, weights):
+    pytest.importorskip("cv2")
+    # Without the fused kernel, OpenCV resize + NumPy normalization is used
+    monkeypatch.setattr(detector_module, "letterbox_norm_chw", None)
+    det = WildlifeDetector(model_path=str(weights), input_size=64)
+    det._preproc_uint8 = np.zeros((64, 64, 3), dtype=np.uint8)
+    det._preproc_float = np.zeros((1, 3, 64, 64), dtype=np.float32)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[..., 0] = 255
+    frame[..., 1] = 51
+    
+    assert det._letterbox_into(frame, 0) == (1.0, 0, 8)
+    
+    tensor = det._preproc_float[0]
+    assert np.allclose(tensor[:, :8], 114 / 255)
+    assert np.allclose(tensor[:, 56:], 114 / 255)
+    assert np.allclose(tensor[0, 8:56], 1.0)
+    assert np.allclose(tensor[1, 8:56], 0.2)
+    assert np.allclose(tensor[2, 8:56], 0.0)
+    
+    # A box in tensor space maps back onto the frame it came from
+    [box] = _collect(det, [[0, 8, 32, 32, 0.9, 19]], (1.0, 0, 8), frame.shape)
+    assert box.bbox == (0, 0, 32, 24)
+    
+    # Downscaled frames are letterboxed the same way
+    frame = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    assert det._letterbox_into(frame, 0) == (0.05, 0, 14)
+    assert np.allclose(tensor[:, :14], 114 / 255)
+    assert np.allclose(tensor[:, 14:50], 1.0)
+    assert np.allclose(tensor[:, 50:], 114 / 255)
@@ -0,0 +1,37 @@
+"""Tests for detection image storage housekeeping."""
+
+import os
+import time
+
+from src.storage.image_store import ImageStore
+
+
+def _write(path, size: int, age_days: float = 0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_cleanup_skips_subdirectories_and_keeps_size_cache(tmp_path):
+    store = ImageStore(str(tmp_path), cleanup_days=30)
+    _write(tmp_path / "2020-01-01" / "old_a.jpg", 1000, age_days=60)
+    _write(tmp_path / "2020-01-01" / "old_b.jpg", 500, age_days=60)
+    _write(tmp_path / "2020-01-01" / "thumbs" / "old_c.jpg", 200, age_days=60)
+    _write(tmp_path / "2020-01-02" / "old_d.jpg", 300, age_days=60)
+    old = time.time() - 60 * 86400
+    os.utime(tmp_path / "2020-01-01" / "thumbs", (old, old))
+    _write(tmp_path / "2099-01-01" / "new.jpg", 700)
+    assert store.get_storage_size_mb() * 1024 * 1024 == 2700
+    
+    files_deleted, mb_freed = store.cleanup_old_images()
+    
+    assert files_deleted == 3
+    assert mb_freed * 1024 * 1024 == 1800
+    # The folder with a subdirectory stays; the emptied one is removed
+    assert (tmp_path / "2020-01-01" / "thumbs" / "old_c.jpg").exists()
+    assert not (tmp_path / "2020-01-01" / "old_a.jpg").exists()
+    assert not (tmp_path / "2020-01-02").exists()
+    assert (tmp_path / "2099-01-01" / "new.jpg").exists()
+    # Cached total agrees with a fresh scan
+    assert store.get_storage_size_mb() * 1024 * 1024 == store._scan_size(tmp_path) == 900
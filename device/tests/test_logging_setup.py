@@ -0,0 +1,143 @@
+"""Tests for the queued, buffered logging pipeline."""
+
+import logging
+import os
+import queue
+
+import pytest
+
+from src.utils import logging_setup
+from src.utils.logging_setup import (
+    BufferedRotatingFileHandler,
+    _BlockingStopListener,
+    _DroppingQueueHandler,
+)
+
+
+def _record(i: int) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, f"record {i:04d}", None, None)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "test.log"
+
+
+def test_records_stay_buffered_while_more_are_pending(log_path):
+    pending = [True]
+    handler = BufferedRotatingFileHandler(
+        log_path, maxBytes=1024 * 1024, backupCount=1, pending=lambda: pending[0]
+    )
+    try:
+        for i in range(100):
+            handler.handle(_record(i))
+        assert os.path.getsize(log_path) == 0
+        
+        # The queue drains: the next record flushes the whole burst
+        pending[0] = False
+        handler.handle(_record(100))
+        assert os.path.getsize(log_path) == 101 * len("record 0000\n")
+    finally:
+        handler.close()
+
+
+def test_flush_writes_buffered_records(log_path):
+    handler = BufferedRotatingFileHandler(log_path, maxBytes=1024 * 1024, pending=lambda: True)
+    try:
+        handler.handle(_record(0))
+        assert os.path.getsize(log_path) == 0
+        handler.flush()
+        assert log_path.read_text() == "record 0000\n"
+    finally:
+        handler.close()
+
+
+def test_unbuffered_without_pending_callback(log_path):
+    handler = BufferedRotatingFileHandler(log_path, maxBytes=1024 * 1024)
+    try:
+        handler.handle(_record(0))
+        assert log_path.read_text() == "record 0000\n"
+    finally:
+        handler.close()
+
+
+def test_rotates_on_byte_count_of_buffered_writes(log_path):
+    line = len("record 0000\n")
+    handler = BufferedRotatingFileHandler(
+        log_path, maxBytes=10 * line, backupCount=2, pending=lambda: True
+    )
+    try:
+        for i in range(25):
+            handler.handle(_record(i))
+        handler.flush()
+    finally:
+        handler.close()
+    
+    backup1 = log_path.with_name("test.log.1")
+    backup2 = log_path.with_name("test.log.2")
+    assert backup2.read_text().splitlines() == [f"record {i:04d}" for i in range(0, 9)]
+    assert backup1.read_text().splitlines() == [f"record {i:04d}" for i in range(9, 18)]
+    assert log_path.read_text().splitlines() == [f"record {i:04d}" for i in range(18, 25)]
+
+
+def test_existing_file_size_counts_towards_rollover(log_path):
+    log_path.write_text("x" * 100 + "\n")
+    handler = BufferedRotatingFileHandler(log_path, maxBytes=110, backupCount=1)
+    try:
+        handler.handle(_record(0))
+    finally:
+        handler.close()
+    
+    assert log_path.with_name("test.log.1").read_text() == "x" * 100 + "\n"
+    assert log_path.read_text() == "record 0000\n"
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+    
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_drops_are_reported_once_the_queue_has_room():
+    log_queue = queue.Queue(2)
+    handler = _DroppingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(_record(i))
+    assert handler.dropped == 3
+    
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(_record(5))
+    
+    assert log_queue.get_nowait().getMessage() == "record 0005"
+    assert log_queue.get_nowait().getMessage() == "Log queue full: dropped 3 log records"
+    assert handler.take_unreported() == 0
+
+
+def test_stop_logging_reports_unreported_drops(monkeypatch):
+    log_queue = queue.Queue(4)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    queue_handler.dropped = 7
+    sink = _ListHandler()
+    listener = _BlockingStopListener(log_queue, sink)
+    listener.start()
+    monkeypatch.setattr(logging_setup, "_listener", listener)
+    monkeypatch.setattr(logging_setup, "_queue_handler", queue_handler)
+    
+    queue_handler.handle(_record(0))
+    logging_setup.stop_logging()
+    
+    # The record that made it in already carried the report
+    assert sink.messages == ["record 0000", "Log queue full: dropped 7 log records"]
+    
+    queue_handler.dropped = 9
+    listener = _BlockingStopListener(log_queue, sink)
+    listener.start()
+    monkeypatch.setattr(logging_setup, "_listener", listener)
+    monkeypatch.setattr(logging_setup, "_queue_handler", queue_handler)
+    logging_setup.stop_logging()
+    
+    assert sink.messages[-1] == "Log queue full: dropped 2 log records"
@@ -0,0 +1,56 @@
+"""Tests for the fused letterbox/normalize/CHW preprocessing kernel."""
+
+import numpy as np
+import pytest
+
+from src.core._preproc import _letterbox_norm_chw, letterbox_norm_chw
+
+PAD = 114 / 255
+
+
+def _run(kernel, src, size):
+    dst = np.zeros((3, size, size), dtype=np.float32)
+    transform = kernel(src, dst, 114)
+    return transform, dst
+
+
+def test_frame_that_fits_is_copied_and_padded():
+    src = np.random.default_rng(0).integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+    
+    (scale, pad_x, pad_y), dst = _run(_letterbox_norm_chw, src, 64)
+    
+    assert (scale, pad_x, pad_y) == (1.0, 0, 8)
+    assert np.allclose(dst[:, :8], PAD) and np.allclose(dst[:, 56:], PAD)
+    assert np.allclose(dst[:, 8:56], src.transpose(2, 0, 1) / 255, atol=1e-6)
+
+
+def test_tall_frame_is_padded_left_and_right():
+    src = np.full((64, 32, 3), 255, dtype=np.uint8)
+    
+    (scale, pad_x, pad_y), dst = _run(_letterbox_norm_chw, src, 32)
+    
+    assert (scale, pad_x, pad_y) == (0.5, 8, 0)
+    assert np.allclose(dst[:, :, :8], PAD) and np.allclose(dst[:, :, 24:], PAD)
+    assert np.allclose(dst[:, :, 8:24], 1.0)
+
+
+def test_matches_opencv_bilinear_letterbox():
+    cv2 = pytest.importorskip("cv2")
+    src = np.random.default_rng(1).integers(0, 256, size=(96, 128, 3), dtype=np.uint8)
+    
+    (scale, pad_x, pad_y), dst = _run(_letterbox_norm_chw, src, 64)
+    
+    assert (scale, pad_x, pad_y) == (0.5, 0, 8)
+    expected = cv2.resize(src, (64, 48), interpolation=cv2.INTER_LINEAR)
+    assert np.allclose(dst[:, 8:56], expected.transpose(2, 0, 1) / 255, atol=1.5 / 255)
+
+
+@pytest.mark.skipif(letterbox_norm_chw is None, reason="no compiled preprocessing kernel")
+def test_compiled_kernel_matches_reference():
+    src = np.random.default_rng(2).integers(0, 256, size=(72, 128, 3), dtype=np.uint8)
+    
+    transform, dst = _run(letterbox_norm_chw, src, 64)
+    expected_transform, expected = _run(_letterbox_norm_chw, src, 64)
+    
+    assert tuple(transform) == expected_transform
+    assert np.allclose(dst, expected, atol=1e-5)